@@ -0,0 +1,197 @@
+"""
+This module benchmarks snake controllers without a display. Each controller
+plays the same seeded games on a GameBoard, and the throughput, the latency
+of each step and the final snake lengths are reported as JSON, so changes to
+the engine or an agent can be compared run to run.
+
+Controllers are listed in CONTROLLERS by name, with a function that builds
+the controller for a board. New agents are benchmarked by adding them there.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+
+# Keep pygame's import banner out of the JSON written to stdout
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+# pylint: disable=wrong-import-position
+from snake_model import GameBoard
+from snake_controller import (MarkovPlayer, RLPlayer, PathPlayer,
+                              HamiltonianPlayer, CYCLE_CACHE_DIR)
+from snake_qtable import QTable
+
+
+def make_rl_player(board, agent, seed, cache_dir):
+    """
+    Return an RLPlayer playing with a fresh copy of the agent at path agent
+    """
+    if agent is None:
+        raise ValueError("the rl controller needs the path to an agent")
+    return RLPlayer(board, None, None, table=QTable.read(agent, seed))
+
+
+# Function building each controller from a board, the agent path, a seed and
+# the directory of cached Hamiltonian cycles
+CONTROLLERS = {
+    "markov": lambda board, agent, seed, cache_dir: MarkovPlayer(board, seed),
+    "rl": make_rl_player,
+    "path": lambda board, agent, seed, cache_dir: PathPlayer(board),
+    "hamiltonian": lambda board, agent, seed, cache_dir:
+        HamiltonianPlayer(board, cache_dir=cache_dir),
+    "hamiltonian_shortcuts": lambda board, agent, seed, cache_dir:
+        HamiltonianPlayer(board, shortcuts=True, cache_dir=cache_dir),
+}
+
+
+def benchmark_controller(name, episodes, side=20, seed=0, agent=None,
+                         max_steps=None, cache_dir=CYCLE_CACHE_DIR):
+    """
+    Play seeded games with a controller and measure them
+
+    Game i is played with seed + i, so every controller sees the same apple
+    sequence as long as it eats at the same steps.
+
+    Args:
+        name: a string key of CONTROLLERS
+        episodes: an int for the number of games to play
+        side: an int for the side length of the board
+        seed: an int seed for the first game
+        agent: an optional string path to the agent of the rl controller
+        max_steps: an optional int for the most steps a game may take, 100
+        times the number of squares by default
+        cache_dir: a string path to the directory of cached Hamiltonian
+        cycles, or None to not use the disk cache
+    Returns:
+        a dict of the measurements, see the keys below
+    """
+    if max_steps is None:
+        max_steps = 100 * side * side
+    board = GameBoard(side, seed)
+    controller = CONTROLLERS[name](board, agent, seed, cache_dir)
+    latencies = []
+    lengths = []
+    truncated = 0
+
+    start = time.perf_counter()
+    for episode in range(episodes):
+        if episode > 0:
+            board.reset(seed + episode)
+            if hasattr(controller, "new_game"):
+                controller.new_game(board)
+        steps = 0
+        while not board.end_condition and steps < max_steps:
+            step_start = time.perf_counter_ns()
+            controller.act()
+            board.check_next_square()
+            latencies.append(time.perf_counter_ns() - step_start)
+            steps += 1
+        truncated += not board.end_condition
+        lengths.append(board.snake_length)
+    seconds = time.perf_counter() - start
+
+    latencies = np.array(latencies) / 1000
+    return {
+        "episodes": episodes,
+        "steps": len(latencies),
+        "truncated_episodes": truncated,
+        "seconds": seconds,
+        "steps_per_second": len(latencies) / seconds,
+        "episodes_per_second": episodes / seconds,
+        "step_latency_us": {
+            "p50": float(np.percentile(latencies, 50)),
+            "p99": float(np.percentile(latencies, 99)),
+            "max": float(latencies.max()),
+        },
+        "length": {
+            "mean": float(np.mean(lengths)),
+            "max": int(np.max(lengths)),
+        },
+    }
+
+
+def run_benchmark(controllers, episodes, side=20, seed=0, agent=None,
+                  max_steps=None, cache_dir=CYCLE_CACHE_DIR):
+    """
+    Benchmark several controllers on the same seeded games
+
+    A controller that fails, e.g. hamiltonian on a board without a cycle,
+    gets an entry with its error instead of measurements, and the other
+    controllers are still benchmarked.
+
+    Args:
+        controllers: a list of string keys of CONTROLLERS
+        episodes: an int for the number of games each controller plays
+        side: an int for the side length of the board
+        seed: an int seed for the first game
+        agent: an optional string path to the agent of the rl controller
+        max_steps: an optional int for the most steps a game may take
+        cache_dir: a string path to the directory of cached Hamiltonian
+        cycles, or None to not use the disk cache
+    Returns:
+        a dict with the settings, the environment and the results of each
+        controller, ready to be written as JSON
+    """
+    results = {}
+    for name in controllers:
+        try:
+            results[name] = benchmark_controller(name, episodes, side, seed,
+                                                 agent, max_steps, cache_dir)
+        except Exception as error:  # pylint: disable=broad-except
+            results[name] = {"error": f"{type(error).__name__}: {error}"}
+    return {
+        "settings": {
+            "episodes": episodes,
+            "side": side,
+            "seed": seed,
+            "agent": None if agent is None else str(agent),
+            "max_steps": max_steps,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("controllers", nargs="*", default=None,
+                        help="controllers to benchmark, out of "
+                        f"{', '.join(sorted(CONTROLLERS))}, by default "
+                        "markov, rl, path and hamiltonian")
+    parser.add_argument("--episodes", type=int, default=20,
+                        help="games each controller plays")
+    parser.add_argument("--side", type=int, default=20,
+                        help="side length of the board")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the first game")
+    parser.add_argument("--agent", default="snake1.csv",
+                        help="path to the agent of the rl controller")
+    parser.add_argument("--max-steps", type=int, default=None,
+                        help="most steps a game may take")
+    parser.add_argument("--cache-dir", default=CYCLE_CACHE_DIR,
+                        help="directory of cached Hamiltonian cycles")
+    parser.add_argument("--output", default=None,
+                        help="path to write the JSON to, stdout by default")
+    args = parser.parse_args()
+    if not args.controllers:
+        args.controllers = ["markov", "rl", "path", "hamiltonian"]
+    unknown = sorted(set(args.controllers) - set(CONTROLLERS))
+    if unknown:
+        parser.error(f"unknown controllers: {', '.join(unknown)}")
+
+    report = run_benchmark(args.controllers, args.episodes, args.side,
+                           args.seed, args.agent, args.max_steps,
+                           args.cache_dir)
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
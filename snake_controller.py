@@ -4,11 +4,23 @@ SnakePlayer. It includes methods for checking for arrow key input and updating
 the gameboard accordingly.
 """
 
+import heapq
+import os
 import sys
+import time
+from collections import deque
 import pygame
-import random
 import numpy as np
-import pandas as pd
+from snake_model import BORDER, SNAKE, DIRECTIONS
+from snake_qtable import QTable, encode_state
+from snake_storage import GameRecordWriter
+
+# Directory the Hamiltonian cycle of each board size is cached in, in the
+# user's cache directory rather than next to the source
+CYCLE_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"),
+                                                     ".cache"),
+    "snake")
 
 
 class SnakePlayer:
@@ -102,6 +114,94 @@ def check_input_list(event_type=None):
     """
     return pygame.event.peek(event_type)
 
+class MarkovPolicy:
+    """
+    Greedy one-step policy of MarkovPlayer, vectorized over many boards.
+
+    Each of the four directions is scored from the markov_state of a board
+    with MarkovPlayer.rewards, and the best direction is chosen, breaking
+    ties at random with a seeded generator.
+
+    Attributes:
+        _rng: a NumPy random Generator used to break ties
+    """
+
+    def __init__(self, seed=None):
+        """
+        Initialize the policy
+
+        Args:
+            seed: an optional seed for breaking ties between directions
+        Returns:
+            No return value
+        """
+        self._rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def outcomes(empty, to_apple, apple):
+        """
+        Return the score of each direction
+
+        Args:
+            empty: a boolean array of shape (4,) or (n, 4) marking the
+            squares next to the head that are not blocked, in the order of
+            MarkovPlayer.key_value
+            to_apple: a boolean array of the same shape marking the squares
+            closer to the apple than the head
+            apple: a boolean array of the same shape marking the apple
+        Returns:
+            an int array of the same shape with the score of each direction
+        """
+        rewards = MarkovPlayer.rewards
+        empty = np.asarray(empty, dtype=bool)
+        to_apple = np.asarray(to_apple, dtype=bool)
+        apple = np.asarray(apple, dtype=bool)
+        return np.where(empty, 0, rewards["obstacle"]) + \
+            np.where(to_apple, rewards["to_apple"], rewards["away_apple"]) + \
+            np.where(apple, rewards["apple"], 0)
+
+    def choose(self, empty, to_apple, apple):
+        """
+        Return the index in MarkovPlayer.key_value of the best direction of
+        every board, breaking ties at random
+
+        Args:
+            empty: a boolean array of shape (4,) or (n, 4), see outcomes
+            to_apple: a boolean array of the same shape, see outcomes
+            apple: a boolean array of the same shape, see outcomes
+        Returns:
+            an int for a single board, or an int array of shape (n,)
+        """
+        outcomes = self.outcomes(empty, to_apple, apple)
+        best = outcomes == outcomes.max(axis=-1, keepdims=True)
+        return np.argmax(best * self._rng.random(best.shape), axis=-1)
+
+    def directions(self, empty, to_apple, apple):
+        """
+        Return the best direction of every board as (row, col) rows
+
+        Args:
+            empty: a boolean array of shape (n, 4), see outcomes
+            to_apple: a boolean array of shape (n, 4), see outcomes
+            apple: a boolean array of shape (n, 4), see outcomes
+        Returns:
+            an int array of shape (n, 2)
+        """
+        return np.array(MarkovPlayer.key_value)[
+            self.choose(empty, to_apple, apple)]
+
+    def act(self, boards):
+        """
+        Turn every game of a VecGameBoard in its best direction
+
+        Args:
+            boards: a VecGameBoard
+        Returns:
+            No return value
+        """
+        boards.change_direction(self.directions(*boards.markov_state))
+
+
 class MarkovPlayer:
     """
     Snake game controller that is used to update the gameboard using keyboard
@@ -109,6 +209,7 @@ class MarkovPlayer:
 
     Attributes:
         _board: an instance of the GameBoard class
+        _policy: the MarkovPolicy choosing the directions
     """
     key_value = [[1, 0], [0, 1], [-1, 0], [0, -1]]
     rewards = {
@@ -118,7 +219,7 @@ class MarkovPlayer:
         "obstacle": -100
     }
 
-    def __init__(self, board_instance):
+    def __init__(self, board_instance, seed=None):
         """
         Initialize the controller with a gameboard, so that the controller
         can update the model
@@ -126,10 +227,12 @@ class MarkovPlayer:
         Args:
             board_instance: a gameboard, which is an instance of class
             GameBoard
+            seed: an optional seed for breaking ties between directions
         Returns:
             No return value
         """
         self._board = board_instance
+        self._policy = MarkovPolicy(seed)
 
     @property
     def board(self):
@@ -142,16 +245,17 @@ class MarkovPlayer:
             self._board: the gameboard
         """
         return self._board
-    
+
+    @property
+    def policy(self):
+        """
+        Return the MarkovPolicy, which is a private attribute
+        """
+        return self._policy
+
     def calculate_outcomes(self):
-        empty, to_apples, apples = self.board.markov_state
-        outcomes = ~np.array(empty)*self.rewards["obstacle"] + \
-                   np.array(to_apples)*self.rewards["to_apple"] + \
-                   ~np.array(to_apples)*self.rewards["away_apple"] + \
-                   np.array(apples)*self.rewards["apple"]
-        return outcomes
-
-        
+        return self._policy.outcomes(*self.board.markov_state)
+
     def get_input(self):
         """
         Update the gameboard according to the Markov Decision Process
@@ -164,11 +268,509 @@ class MarkovPlayer:
         event = pygame.event.poll()
         if event.type == pygame.QUIT:
             sys.exit()
-        
-        outcomes = self.calculate_outcomes()
-        max_item = max(outcomes)
-        index_list = [index for index in range(len(outcomes)) if outcomes[index] == max_item]
-        self.board.change_direction(self.key_value[random.choice(index_list)])
+
+        self.act()
+
+    def act(self):
+        """
+        Turn the snake in the best direction, without touching the pygame
+        event queue
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+        choice = self._policy.choose(*self.board.markov_state)
+        self.board.change_direction(self.key_value[choice])
+
+
+class PathPlayer:
+    """
+    Snake game controller that steers along a shortest path to the apple.
+
+    The controller keeps a breadth-first search distance field from the apple
+    to every square, going around the borders and the snake. The field is
+    searched from scratch only when the apple moves or a new game starts.
+    After an ordinary move only the new head and the freed tail square
+    change, so the field is patched around those two squares instead.
+
+    Attributes:
+        _board: an instance of the GameBoard class
+        _dist: a list with the path length from the apple to each square,
+        indexed by row * size + col, or unreachable
+        _blocked: a list of booleans marking the Border and Snake squares
+        _apple: the apple location the field was searched from
+        _head: the head location when the field was last updated
+        _tail: the tail location when the field was last updated
+        _length: the snake length when the field was last updated
+        _field_board: the gameboard the field was searched on
+        _full_searches: an int for the number of searches from scratch
+    """
+    unreachable = float("inf")
+
+    def __init__(self, board_instance):
+        """
+        Initialize the controller with a gameboard, so that the controller
+        can update the model
+
+        Args:
+            board_instance: a gameboard, which is an instance of class
+            GameBoard
+        Returns:
+            No return value
+        """
+        self._board = board_instance
+        self._dist = []
+        self._blocked = []
+        self._apple = None
+        self._head = None
+        self._tail = None
+        self._length = None
+        self._field_board = None
+        self._full_searches = 0
+
+    @property
+    def board(self):
+        """
+        Return the gameboard, which is a private attribute
+
+        Args:
+            None
+        Returns:
+            self._board: the gameboard
+        """
+        return self._board
+
+    @property
+    def full_searches(self):
+        """
+        Return the number of times the distance field was searched from
+        scratch
+        """
+        return self._full_searches
+
+    def distance(self, location):
+        """
+        Return the length of the shortest path from the apple to a square
+
+        Args:
+            location: a two-element list for a square on the board
+        Returns:
+            an int, or PathPlayer.unreachable
+        """
+        self._update_field()
+        return self._dist[location[0] * self.board.size + location[1]]
+
+    def get_input(self):
+        """
+        Update the gameboard along the shortest path to the apple
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+        event = pygame.event.poll()
+        if event.type == pygame.QUIT:
+            sys.exit()
+
+        self.act()
+
+    def act(self):
+        """
+        Turn the snake toward the open square closest to the apple, without
+        touching the pygame event queue
+
+        If the apple cannot be reached, the snake moves to the open square
+        with the most open squares around it to stay alive.
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+        self._update_field()
+        size = self.board.size
+        head = self.board.head
+        head_index = head[0] * size + head[1]
+        dist = self._dist
+        blocked = self._blocked
+
+        # Going straight is tried first so ties keep the snake on its line
+        current = tuple(self.board.direction)
+        options = sorted(DIRECTIONS, key=lambda direction: direction != current)
+        best = None
+        best_key = None
+        for delta_row, delta_col in options:
+            index = head_index + delta_row * size + delta_col
+            if blocked[index]:
+                continue
+            open_around = sum(not blocked[index + step]
+                              for step in (1, -1, size, -size))
+            key = (dist[index], -open_around)
+            if best_key is None or key < best_key:
+                best, best_key = [delta_row, delta_col], key
+        if best is not None:
+            self.board.change_direction(best)
+
+    def _update_field(self):
+        """
+        Bring the distance field up to date with the board, patching it after
+        an ordinary move and searching from scratch otherwise
+        """
+        board = self.board
+        head = list(board.head)
+        tail = list(board.tail)
+        same_game = board is self._field_board and \
+            board.apple == self._apple and board.snake_length == self._length
+        if same_game and head == self._head and tail == self._tail:
+            return
+        if same_game and abs(head[0] - self._head[0]) + \
+                abs(head[1] - self._head[1]) == 1:
+            # The snake moved without eating: the head square filled up and
+            # the old tail square opened
+            size = board.size
+            self._block(head[0] * size + head[1])
+            self._free(self._tail[0] * size + self._tail[1])
+        else:
+            self._search()
+        self._head = head
+        self._tail = tail
+
+    def _search(self):
+        """
+        Search the distance field from scratch, starting at the apple
+        """
+        board = self.board
+        size = board.size
+        codes = board.grid.ravel().tolist()
+        self._blocked = [code in (BORDER, SNAKE) for code in codes]
+        self._dist = [self.unreachable] * len(codes)
+        self._field_board = board
+        self._apple = None if board.apple is None else list(board.apple)
+        self._length = board.snake_length
+        self._full_searches += 1
+        if self._apple is None:
+            return
+
+        dist = self._dist
+        blocked = self._blocked
+        start = self._apple[0] * size + self._apple[1]
+        dist[start] = 0
+        queue = deque([start])
+        while queue:
+            index = queue.popleft()
+            next_dist = dist[index] + 1
+            for neighbor in (index + 1, index - 1, index + size,
+                             index - size):
+                if not blocked[neighbor] and dist[neighbor] > next_dist:
+                    dist[neighbor] = next_dist
+                    queue.append(neighbor)
+
+    def _free(self, index):
+        """
+        Mark a square open and lower the distances that now go through it
+        """
+        size = self.board.size
+        dist = self._dist
+        blocked = self._blocked
+        blocked[index] = False
+        dist[index] = min((dist[neighbor] for neighbor in
+                           (index + 1, index - 1, index + size, index - size)
+                           if not blocked[neighbor]),
+                          default=self.unreachable) + 1
+        queue = deque([index])
+        while queue:
+            current = queue.popleft()
+            next_dist = dist[current] + 1
+            for neighbor in (current + 1, current - 1, current + size,
+                             current - size):
+                if not blocked[neighbor] and dist[neighbor] > next_dist:
+                    dist[neighbor] = next_dist
+                    queue.append(neighbor)
+
+    def _block(self, index):
+        """
+        Mark a square blocked and raise the distances of the squares whose
+        every shortest path went through it
+        """
+        size = self.board.size
+        dist = self._dist
+        blocked = self._blocked
+        blocked[index] = True
+        old_dist = dist[index]
+        dist[index] = self.unreachable
+        if old_dist == self.unreachable:
+            return
+
+        # Find the squares left without a neighbor one step closer to the
+        # apple, level by level outward from the blocked square
+        affected = set()
+        queue = deque(neighbor for neighbor in
+                      (index + 1, index - 1, index + size, index - size)
+                      if not blocked[neighbor] and
+                      dist[neighbor] == old_dist + 1)
+        while queue:
+            current = queue.popleft()
+            if current in affected:
+                continue
+            level = dist[current]
+            neighbors = (current + 1, current - 1, current + size,
+                         current - size)
+            if any(not blocked[neighbor] and neighbor not in affected and
+                   dist[neighbor] == level - 1 for neighbor in neighbors):
+                continue
+            affected.add(current)
+            queue.extend(neighbor for neighbor in neighbors
+                         if not blocked[neighbor] and
+                         dist[neighbor] == level + 1)
+
+        # Give the affected squares their best distance through unaffected
+        # neighbors and spread it among them in order of distance
+        heap = []
+        for current in affected:
+            dist[current] = self.unreachable
+        for current in affected:
+            best = min((dist[neighbor] for neighbor in
+                        (current + 1, current - 1, current + size,
+                         current - size)
+                        if not blocked[neighbor] and neighbor not in affected),
+                       default=self.unreachable) + 1
+            if best < self.unreachable:
+                dist[current] = best
+                heapq.heappush(heap, (best, current))
+        while heap:
+            current_dist, current = heapq.heappop(heap)
+            if current_dist > dist[current]:
+                continue
+            for neighbor in (current + 1, current - 1, current + size,
+                             current - size):
+                if neighbor in affected and dist[neighbor] > current_dist + 1:
+                    dist[neighbor] = current_dist + 1
+                    heapq.heappush(heap, (current_dist + 1, neighbor))
+
+
+def hamiltonian_cycle(size, cache_dir=CYCLE_CACHE_DIR):
+    """
+    Return the order in which a Hamiltonian cycle visits every square inside
+    the borders of a board, computed once per size and cached on disk
+
+    The cycle goes down the first column, then zigzags back up through the
+    other columns row by row, ending next to where it started. It exists
+    when the number of squares inside the borders is even.
+
+    Args:
+        size: an int for the side length of the board, borders included
+        cache_dir: a string path to the directory of cached cycles, or None
+        to not use the disk cache. A cache that cannot be written to is
+        skipped.
+    Returns:
+        an int array of shape (size, size) with the position of each square
+        in the cycle, and -1 on the borders
+    Raises:
+        ValueError: if the board has an odd number of squares inside the
+        borders
+    """
+    inner = size - 2
+    if inner < 2 or inner % 2 == 1:
+        raise ValueError(f"a board of size {size} has no Hamiltonian cycle, "
+                         "it needs an even number of squares per side")
+
+    path = None
+    if cache_dir is not None:
+        path = os.path.join(cache_dir, f"hamiltonian_{size}.npy")
+        if os.path.exists(path):
+            try:
+                order = np.load(path)
+            except (OSError, ValueError, EOFError):
+                order = None
+            # A truncated, stale or edited file is rebuilt and overwritten
+            if order is not None and is_hamiltonian_cycle(order, size):
+                return order
+
+    squares = [(row, 0) for row in range(inner)]
+    for turn, row in enumerate(range(inner - 1, -1, -1)):
+        cols = range(1, inner) if turn % 2 == 0 else range(inner - 1, 0, -1)
+        squares.extend((row, col) for col in cols)
+    order = np.full((size, size), -1, dtype=np.int32)
+    for position, (row, col) in enumerate(squares):
+        order[row + 1, col + 1] = position
+
+    if path is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            temp_path = f"{path}.tmp.npy"
+            np.save(temp_path, order)
+            os.replace(temp_path, path)
+        except OSError:
+            # The cycle is cheap to rebuild, so a read-only cache is fine
+            pass
+    return order
+
+
+def is_hamiltonian_cycle(order, size):
+    """
+    Return True if order is a valid cycle for a board, as returned by
+    hamiltonian_cycle
+
+    Args:
+        order: an array with the position of each square in the cycle
+        size: an int for the side length of the board, borders included
+    Returns:
+        True if order is an int array of shape (size, size) that is -1 on
+        the borders, numbers the squares inside them 0 to (size - 2) ** 2 - 1
+        and steps between neighboring squares, including back to the start
+    """
+    if order.shape != (size, size) or \
+            not np.issubdtype(order.dtype, np.integer):
+        return False
+    inner = order[1:-1, 1:-1]
+    border = np.ones((size, size), dtype=bool)
+    border[1:-1, 1:-1] = False
+    if (order[border] != -1).any() or \
+            not np.array_equal(np.sort(inner, axis=None),
+                               np.arange(inner.size)):
+        return False
+    squares = np.argwhere(order >= 0)[np.argsort(order[order >= 0])]
+    steps = np.abs(np.roll(squares, -1, axis=0) - squares).sum(axis=1)
+    return bool((steps == 1).all())
+
+
+class HamiltonianPlayer:
+    """
+    Snake game controller that follows a Hamiltonian cycle through every
+    square, which never crashes and fills the whole board.
+
+    Each move is a lookup in tables of the cycle. With shortcuts on, the
+    snake may skip ahead along the cycle toward the apple as long as the
+    skipped part holds none of its body, keeping the body in the part of the
+    cycle between the tail and the head.
+
+    Attributes:
+        _board: an instance of the GameBoard class
+        _order: a list of lists with the position of each square in the cycle
+        _next: a list of lists with the direction from each square to the next
+        square of the cycle
+        _cycle_length: an int for the number of squares in the cycle
+        _shortcuts: a boolean for whether to skip ahead along the cycle
+    """
+    # Squares kept free between the head and the tail when taking a
+    # shortcut, so the snake can grow after eating
+    shortcut_margin = 3
+
+    # Shortcuts stop once the snake covers this fraction of the cycle
+    shortcut_limit = 0.5
+
+    def __init__(self, board_instance, shortcuts=False,
+                 cache_dir=CYCLE_CACHE_DIR):
+        """
+        Initialize the controller with a gameboard and the cycle for its size
+
+        Args:
+            board_instance: a gameboard, which is an instance of class
+            GameBoard
+            shortcuts: a boolean for whether to skip ahead along the cycle
+            toward the apple when it is safe
+            cache_dir: a string path to the directory of cached cycles, or
+            None to not use the disk cache
+        Returns:
+            No return value
+        """
+        self._board = board_instance
+        self._shortcuts = shortcuts
+        order = hamiltonian_cycle(board_instance.size, cache_dir)
+        self._cycle_length = int(order.max()) + 1
+
+        positions = np.argwhere(order >= 0)
+        squares = positions[np.argsort(order[order >= 0])]
+        next_squares = np.roll(squares, -1, axis=0)
+        self._order = order.tolist()
+        self._next = [[None] * board_instance.size
+                      for _ in range(board_instance.size)]
+        for (row, col), (next_row, next_col) in zip(squares.tolist(),
+                                                    next_squares.tolist()):
+            self._next[row][col] = [next_row - row, next_col - col]
+
+    @property
+    def board(self):
+        """
+        Return the gameboard, which is a private attribute
+
+        Args:
+            None
+        Returns:
+            self._board: the gameboard
+        """
+        return self._board
+
+    @property
+    def shortcuts(self):
+        """
+        Return whether the controller takes shortcuts
+        """
+        return self._shortcuts
+
+    def get_input(self):
+        """
+        Update the gameboard along the Hamiltonian cycle
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+        event = pygame.event.poll()
+        if event.type == pygame.QUIT:
+            sys.exit()
+
+        self.act()
+
+    def act(self):
+        """
+        Turn the snake to the next square of the cycle, or to a safe shortcut,
+        without touching the pygame event queue
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+        head = self.board.head
+        direction = self._next[head[0]][head[1]]
+        if self._shortcuts and self.board.apple is not None and \
+                self.board.snake_length < \
+                self.shortcut_limit * self._cycle_length:
+            direction = self._shortcut(head) or direction
+        self.board.change_direction(direction)
+
+    def _shortcut(self, head):
+        """
+        Return the direction to the neighbor furthest along the cycle that
+        does not pass the apple and keeps shortcut_margin squares ahead of
+        the tail, or None if no neighbor is further than the next square
+        """
+        order = self._order
+        length = self._cycle_length
+        head_position = order[head[0]][head[1]]
+        tail = self.board.tail
+        apple = self.board.apple
+        to_tail = (order[tail[0]][tail[1]] - head_position) % length
+        to_apple = (order[apple[0]][apple[1]] - head_position) % length
+        if self.board.snake_length == 1:
+            to_tail = length
+        limit = min(to_apple, to_tail - self.shortcut_margin)
+
+        best = None
+        best_distance = 1
+        for delta_row, delta_col in DIRECTIONS:
+            position = order[head[0] + delta_row][head[1] + delta_col]
+            if position < 0:
+                continue
+            distance = (position - head_position) % length
+            if best_distance < distance <= limit:
+                best, best_distance = [delta_row, delta_col], distance
+        return best
 
 
 def check_to_exit():
@@ -226,8 +828,14 @@ class RLPlayer:
 
     Attributes:
         _board: an instance of the GameBoard class
+        _table: an instance of the QTable class holding the agent
+        _game_record: a GameRecordWriter for the game record csv, or None
+        _checkpoints: a CheckpointManager for the agent, or None
+        _steps: an int for the number of steps played this game
+        _start_time: a float for the time the game started at
     """
     key_value = [-np.pi/2, 0, np.pi/2]
+    key_turn = [-1, 0, 1]  # key_value as GameBoard.turn arguments
     rewards = {
         "apple": 50,
         "to_apple": 1,
@@ -248,7 +856,8 @@ class RLPlayer:
     Q_columns = ["Q_k_l","Q_k_s","Q_k_r"]
     k_columns = ["k_l","k_s","k_r"]
 
-    def __init__(self, board_instance, path_to_agent, path_to_record, new_agent=True, e=0):
+    def __init__(self, board_instance, path_to_agent, path_to_record, new_agent=True, e=0, table=None,
+                 checkpoints=None):
         """
         Initialize the controller with a gameboard, so that the controller
         can update the model
@@ -256,9 +865,15 @@ class RLPlayer:
         Args:
             board_instance: a gameboard, which is an instance of class
             GameBoard
-            path_to_agent:
+            path_to_agent: a string path to the agent, or None to not save it
+            path_to_record: a string path to the game record csv, or None to
+            not record games
             new_agent:
             e: 
+            table: an optional QTable to play with instead of loading or
+            creating one, so several games can share an agent in memory
+            checkpoints: an optional CheckpointManager that saves the agent
+            in the background instead of after every game
         Returns:
             No return value
         """
@@ -266,27 +881,20 @@ class RLPlayer:
         self._csv = path_to_agent
         self._e = 0
         self._cvs_game_record = path_to_record
-
-        if new_agent: 
-            temp_numpy = np.zeros([self.num_states, len(self.column_names)])
-            i = 0
-            # This should be rewritten to not have this monster for loop nest
-            for direction_tail_x in self.directions:
-                for direction_tail_y in self.directions:
-                    for direction_apple_x in self.directions:
-                        for direction_apple_y in self.directions:
-                            for wall_l in self.walls:
-                                for wall_s in self.walls:
-                                    for wall_r in self.walls:
-                                        temp_numpy[i,:] = np.array([wall_l, wall_s, wall_r, direction_apple_x, direction_apple_y, direction_tail_x, direction_tail_y, self.initial_reward, 1, self.initial_reward, 1, self.initial_reward, 1])
-                                        i += 1
-            self._df = pd.DataFrame(temp_numpy, columns=self.column_names)
-            self._df_game_record = pd.DataFrame(columns=["Game number","Length"])
+        self._steps = 0
+        self._start_time = time.perf_counter()
+        self._checkpoints = checkpoints
+
+        if table is not None:
+            self._table = table
+        elif new_agent: 
+            self._table = QTable.new(self.initial_reward)
         else:
-            self._df = pd.read_csv(self.csv)
-            self._df_game_record = pd.read_csv(self.csv_record)
+            self._table = QTable.read(self.csv)
 
-                                    
+        self._game_record = None
+        if path_to_record is not None:
+            self._game_record = GameRecordWriter(path_to_record)
 
     @property
     def board(self):
@@ -300,17 +908,42 @@ class RLPlayer:
         """
         return self._board
 
+    @property
+    def table(self):
+        """
+        Return the QTable holding the agent, which is a private attribute
+        """
+        return self._table
+
     @property
     def df(self):
         """
+        Return a DataFrame copy of the agent in the agent csv layout
         """
-        return self._df
+        return self.table.to_dataframe()
+
+    @property
+    def game_record(self):
+        """
+        Return the GameRecordWriter for the game record csv, which is a
+        private attribute
+        """
+        return self._game_record
+
+    @property
+    def checkpoints(self):
+        """
+        Return the CheckpointManager for the agent, which is a private
+        attribute
+        """
+        return self._checkpoints
 
     @property
     def df_game_record(self):
         """
+        Return a DataFrame of every recorded game
         """
-        return self._df_game_record
+        return self.game_record.to_dataframe()
 
     @property
     def csv(self):
@@ -330,18 +963,16 @@ class RLPlayer:
         """
         return self._e
     
-    def choose_outcome(self, df, idx):
-
-        if np.random.rand(1) < self.e:
-            return np.random.rand(3)
-        else:
-            outcomes = [df.at[idx,"Q_k_l"]/df.at[idx,"k_l"], 
-                        df.at[idx,"Q_k_s"]/df.at[idx,"k_s"],
-                        df.at[idx,"Q_k_r"]/df.at[idx,"k_r"]]
-        return outcomes
-
+    def choose_outcome(self, idx):
+        """
+        Return the index of the action to take in a state: a random action
+        with probability e, and otherwise the action with the highest average
+        reward, breaking ties at random
+        """
+        if np.random.rand() < self.e:
+            return np.random.randint(len(self.key_turn))
+        return self.table.greedy(idx)
 
-        
     def get_input(self):
         """
         Update the gameboard according to the Markov Decision Process
@@ -354,41 +985,77 @@ class RLPlayer:
         event = pygame.event.poll()
         if event.type == pygame.QUIT:
             sys.exit()
-        
-        df = self.df
-        walls, apple, tail = self.board.rl_state
-        row = df.loc[(df["w_l"] == walls[0]) & (df["w_s"] == walls[1]) & (df["w_r"] == walls[2]) \
-                   & (df["apple_x"] == apple[0]) & (df["apple_y"] == apple[1]) \
-                   & (df["tail_x"] == tail[0]) & (df["tail_y"] == tail[1])]
-        idx = row.index[0]
-        outcomes = self.choose_outcome(self.df, idx)
-
-        max_item = max(outcomes)
-        index_list = [index for index in range(len(outcomes)) if outcomes[index] == max_item]
-        chosen_index = random.choice(index_list)
-        rotation = self.board.R_angle(self.key_value[chosen_index])
-        self.board.change_direction((rotation @ np.array(self.board.direction)).astype(int).tolist())
+
+        self.act()
+
+    def act(self):
+        """
+        Choose the next direction from the agent and learn from its reward,
+        without touching the pygame event queue
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+        self._steps += 1
+        idx = encode_state(*self.board.rl_state)
+        chosen_index = self.choose_outcome(idx)
+        self.board.turn(self.key_turn[chosen_index])
 
         reward = self.check_next_reward()
         self.add_entry(idx, chosen_index, reward)
 
-
-        
     def add_entry(self, index, chosen_idx, value):
-        self._df.at[index, self.Q_columns[chosen_idx]] += value
-        self._df.at[index, self.k_columns[chosen_idx]] += 1
+        self.table.update(index, chosen_idx, value)
 
 
     def add_game_record(self, length):
-        new_record = pd.DataFrame([[1, length]],columns=["Game number","Length"])
-        self._df_game_record = self._df_game_record.append(new_record)
+        """
+        Buffer a game in the game record with the steps, time and seed, if
+        the player keeps a game record
+        """
+        if self.game_record is None:
+            return
+        self.game_record.record(length, self._steps,
+                                time.perf_counter() - self._start_time,
+                                self.board.seed)
+
+    def new_game(self, board_instance):
+        """
+        Reset the episode state to play a new game with the same agent
+
+        Args:
+            board_instance: the GameBoard of the new game
+        Returns:
+            No return value
+        """
+        self._board = board_instance
+        self._steps = 0
+        self._start_time = time.perf_counter()
 
     def export_at_endgame(self):
         """
+        Save the agent, or let the CheckpointManager know the game is over,
+        and buffer the finished game in the game record, which is written in
+        batches and by close
         """
-        self.df.to_csv(self.csv, index=False)
+        if self.checkpoints is not None:
+            self.checkpoints.episode_done()
+        elif self.csv is not None:
+            self.table.write(self.csv)
         self.add_game_record(self.board.snake_length)
-        self.df_game_record.to_csv(self.csv_record, index=False)
+
+    def close(self):
+        """
+        Wait for a final checkpoint of the agent and write any buffered games
+        """
+        try:
+            if self.checkpoints is not None:
+                self.checkpoints.close()
+        finally:
+            if self.game_record is not None:
+                self.game_record.close()
 
     def check_next_reward(self):
         """
@@ -397,13 +1064,12 @@ class RLPlayer:
         or game over.
         """
 
-        direction = np.array(self.board.direction)
-        snake_head = np.array(self.board.snake[0])
-        apple = np.array(self.board.apple)
-        next_square = snake_head + direction
+        direction = self.board.direction
+        snake_head = self.board.head
+        next_square = [snake_head[0] + direction[0], snake_head[1] + direction[1]]
 
-        base_reward = self.board.board_array[next_square[0]][next_square[1]].reward
-        if np.linalg.norm(snake_head - apple) > np.linalg.norm(next_square - apple):
+        base_reward = self.board.get_square(next_square).reward
+        if self.board.toward_apple(next_square):
             return base_reward + 0.05
         return base_reward
 
@@ -432,6 +1098,7 @@ def check_to_exit_rl(controller):
     """
     if pygame.event.peek(pygame.QUIT):
         controller.export_at_endgame()
+        controller.close()
         sys.exit()
 
 
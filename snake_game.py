@@ -28,26 +28,29 @@ def main():
     controls = SnakePlayer(gameboard)
     
 
-    graphic_view.draw()
-
-    pygame.event.clear()
-    while not check_input_list(pygame.KEYDOWN):
-        graphic_view.start_text()
-        check_to_exit()
-
-    while not gameboard.end_condition:
-        controls.get_input()
-        gameboard.check_next_square()
+    try:
         graphic_view.draw()
-        check_to_exit()
-        time.sleep(.2)
-        print(gameboard.rl_state)
-
-    while gameboard.end_condition:
-        graphic_view.draw_gameover()
-        if get_restart_input() is True:
-            main()
-        check_to_exit()
+
+        pygame.event.clear()
+        while not check_input_list(pygame.KEYDOWN):
+            graphic_view.start_text()
+            check_to_exit()
+
+        while not gameboard.end_condition:
+            controls.get_input()
+            gameboard.check_next_square()
+            graphic_view.draw()
+            check_to_exit()
+            time.sleep(.2)
+            print(gameboard.rl_state)
+
+        while gameboard.end_condition:
+            graphic_view.draw_gameover()
+            if get_restart_input() is True:
+                main()
+            check_to_exit()
+    finally:
+        graphic_view.quit()
 
 
 if __name__ == "__main__":
@@ -2,10 +2,9 @@
 This module assembles the MVC components to create a functional snake game.
 """
 
-import time
 import pygame
 from snake_model import GameBoard
-from snake_view import PygameView
+from snake_view import PygameView, RenderScheduler
 from snake_controller import SnakePlayer, MarkovPlayer, check_to_exit, check_input_list, get_restart_input
 
 
@@ -27,26 +26,29 @@ def main():
     graphic_view = PygameView(gameboard)
     controls = SnakePlayer(gameboard)
     fake_controls = MarkovPlayer(gameboard)
+    scheduler = RenderScheduler(graphic_view, max_fps=20, throttle=True)
 
-    graphic_view.draw()
-
-    pygame.event.clear()
-    while not check_input_list(pygame.KEYDOWN):
-        graphic_view.start_text()
-        check_to_exit()
-
-    while not gameboard.end_condition:
-        fake_controls.get_input()
-        gameboard.check_next_square()
+    try:
         graphic_view.draw()
-        check_to_exit()
-        time.sleep(.05)
-
-    while gameboard.end_condition:
-        graphic_view.draw_gameover()
-        if get_restart_input() is True:
-            main()
-        check_to_exit()
+
+        pygame.event.clear()
+        while not check_input_list(pygame.KEYDOWN):
+            graphic_view.start_text()
+            check_to_exit()
+
+        while not gameboard.end_condition:
+            fake_controls.get_input()
+            gameboard.check_next_square()
+            scheduler.step()
+            check_to_exit()
+
+        while gameboard.end_condition:
+            graphic_view.draw_gameover()
+            if get_restart_input() is True:
+                main()
+            check_to_exit()
+    finally:
+        graphic_view.quit()
 
 
 if __name__ == "__main__":
@@ -2,52 +2,140 @@
 This module assembles the MVC components to create a functional snake game.
 """
 
+import argparse
 import time
 import pygame
-from snake_model import GameBoard
-from snake_view import PygameView, PygameViewRL
-from snake_controller import SnakePlayer, MarkovPlayer, RLPlayer, check_to_exit, check_to_exit_rl, check_input_list, get_restart_input
-import pandas as pd
+from snake_view import PygameViewRL, RenderScheduler, TextView
+from snake_controller import check_to_exit_rl
+from snake_trainer import RLTrainer
 
 csv = "snake1.csv"
+record_csv = "snake1_record.csv"
 rounds = 500
 
-def main():
+def main(render_every=1, episode_every=1, fps=20, flat_out=False):
     """
     Run a learning round of snake games
 
+    By default every step is drawn at 20 frames per second. The other
+    settings let the games run faster than they are drawn.
+
     Args:
-        None
+        render_every: an int for the number of steps per drawn frame
+        episode_every: an int for the number of games per drawn game
+        fps: an int for the most frames drawn per second
+        flat_out: a boolean, True to drop frames instead of waiting for them
     Returns:
         No return value
     """
-    for i in range(rounds):
+    pygame.init()
 
-        pygame.init()
+    pygame.event.set_allowed(pygame.QUIT)
+    pygame.event.set_allowed(pygame.KEYDOWN)
 
-        pygame.event.set_allowed(pygame.QUIT)
-        pygame.event.set_allowed(pygame.KEYDOWN)
+    trainer = RLTrainer(csv, record_csv, e=0)
+    graphic_view = PygameViewRL(trainer.board)
+    trainer.attach_view(graphic_view)
+    fake_controls = trainer.controller
+    scheduler = RenderScheduler(graphic_view, render_every, episode_every,
+                                fps, throttle=not flat_out)
 
-        gameboard = GameBoard(20)
-        graphic_view = PygameViewRL(gameboard)
-        controls = SnakePlayer(gameboard)
-        fake_controls = RLPlayer(gameboard,"snake1.csv", "snake1_record.csv", new_agent=False, e=0)
+    def show_step():
+        if scheduler.step():
+            check_to_exit_rl(fake_controls)
 
-        graphic_view.draw()
+    try:
+        for i in range(rounds):
+            if scheduler.start_episode():
+                graphic_view.draw()
+            pygame.event.clear()
+            trainer.play_episode(on_step=show_step)
+            check_to_exit_rl(fake_controls)
 
-        pygame.event.clear()
+        trainer.close()
+    finally:
+        graphic_view.quit()
 
-        while not gameboard.end_condition:
-            fake_controls.get_input()
-            gameboard.check_next_square()
-            graphic_view.draw()
-            check_to_exit_rl(fake_controls)
-            time.sleep(.05)
 
-        fake_controls.export_at_endgame()
+def train_headless(episodes=rounds, time_budget=None, path_to_agent=csv,
+                   path_to_record=record_csv, checkpoint_every=50,
+                   checkpoint_seconds=None, terminal=False, render_every=1,
+                   episode_every=1, fps=None):
+    """
+    Run learning rounds of snake games without a display, event polling or
+    sleeping, so training is only limited by the episode and time budgets
 
+    The agent is loaded once and saved in the background every
+    checkpoint_every games or checkpoint_seconds seconds, and once more at
+    the end.
 
+    Args:
+        episodes: an int for the maximum number of games to play
+        time_budget: a float for the maximum number of seconds to train, or
+        None for no time limit
+        path_to_agent: a string path to the agent csv
+        path_to_record: a string path to the game record csv
+        checkpoint_every: an int for the games between saves of the agent,
+        or None
+        checkpoint_seconds: a float for the seconds between saves of the
+        agent, or None
+        terminal: a boolean for whether to draw the games in the terminal
+        render_every: an int for the number of steps per drawn frame
+        episode_every: an int for the number of games per drawn game
+        fps: an optional int for the most frames drawn per second, with
+        frames that come too soon dropped
+    Returns:
+        played: an int for the number of games played
+    """
+    trainer = RLTrainer(path_to_agent, path_to_record, e=0,
+                        checkpoint_every=checkpoint_every,
+                        checkpoint_seconds=checkpoint_seconds)
+    scheduler = None
+    if terminal:
+        text_view = TextView(trainer.board)
+        trainer.attach_view(text_view)
+        scheduler = RenderScheduler(text_view, render_every, episode_every,
+                                    fps)
+    played = trainer.train(episodes, time_budget, scheduler=scheduler)
+    trainer.close()
+    return played
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--headless", action="store_true",
+                        help="train without a display or frame delay")
+    parser.add_argument("--episodes", type=int, default=rounds,
+                        help="maximum number of games to play")
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="maximum number of seconds to train headless")
+    parser.add_argument("--checkpoint-every", type=int, default=50,
+                        help="games between saves of the agent when headless")
+    parser.add_argument("--checkpoint-seconds", type=float, default=None,
+                        help="seconds between saves of the agent when headless")
+    parser.add_argument("--terminal", action="store_true",
+                        help="draw the games in the terminal when headless")
+    parser.add_argument("--render-every", type=int, default=1,
+                        help="steps per drawn frame")
+    parser.add_argument("--render-episodes", type=int, default=1,
+                        help="games per drawn game")
+    parser.add_argument("--fps", type=int, default=20,
+                        help="most frames drawn per second")
+    parser.add_argument("--flat-out", action="store_true",
+                        help="drop frames instead of slowing the games down")
+    args = parser.parse_args()
+
+    if args.headless:
+        start_time = time.perf_counter()
+        games = train_headless(args.episodes, args.time_budget,
+                               checkpoint_every=args.checkpoint_every,
+                               checkpoint_seconds=args.checkpoint_seconds,
+                               terminal=args.terminal,
+                               render_every=args.render_every,
+                               episode_every=args.render_episodes,
+                               fps=args.fps)
+        print(f"Trained {games} games in "
+              f"{time.perf_counter() - start_time:.1f} seconds")
+    else:
+        rounds = args.episodes
+        main(args.render_every, args.render_episodes, args.fps, args.flat_out)
@@ -1,14 +1,41 @@
 """
 This file outlines the GameBoard class that creates a model of the snake board
-squares using a 2D list. It also includes the abstract class Object that's
-inheritors are placed in the GameBoard to represent types of squares.
+squares using a NumPy grid of integer cell codes. It also includes the abstract
+class Object that's inheritors are used as a view of each type of square.
 """
 
 from abc import ABC, abstractmethod
+from collections import deque
 import math
 import random
 import numpy as np
 
+# Integer codes stored in GameBoard._grid, one per type of square.
+BLANK = 0
+BORDER = 1
+SNAKE = 2
+APPLE = 3
+
+# Directions of motion (delta row, delta column) indexed by integer direction
+# code. The code order matches the angles in GameBoard.direction2angle, so
+# adding one to a code turns the snake to its left.
+DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+# Offsets of the squares to the left, straight ahead and right of the snake
+# head for each direction code.
+TURN_OFFSETS = tuple(tuple(DIRECTIONS[(code + turn) % 4] for turn in (1, 0, -1))
+                     for code in range(4))
+
+# Integer rotation matrices R_angle(code * pi / 2) for each direction code,
+# used to turn vectors on the board into the snake's frame of reference.
+FRAME_ROTATIONS = (
+    ((1, 0), (0, 1)),
+    ((0, -1), (1, 0)),
+    ((-1, 0), (0, -1)),
+    ((0, 1), (-1, 0)),
+)
+
 
 class GameBoard:
     """
@@ -16,13 +43,28 @@ class GameBoard:
 
     Attributes:
     _end_condition: Boolean representation for if game is over.
-    _board_array: 2D list containing the one of objects (Apple, Blank, Border,
-                  or Snake) for each square of the board
+    _grid: 2D int8 NumPy array containing the cell code (BLANK, BORDER, SNAKE
+           or APPLE) for each square of the board
     _size: An integer for side length of the board in squares.
-    _snake: List of ordered Snake positions (from head to end of tail).
-    _apple: List for Apple position.
+    _snake: Deque of ordered Snake positions (from head to end of tail). The
+            head is pushed and the tail popped in constant time, and _grid
+            doubles as the occupancy bitmap for collision checks.
+    _apple: List for Apple position, or None once the board is full.
+    _free: List of flat indices (row * _size + col) of every Blank square.
+    _free_slot: List mapping each flat index to its position in _free, or -1
+                if the square is not Blank.
+    _marked: Boolean for whether squares were marked outside of the game
+             with mark_square since the last reset.
+    _changes: Set of (row, col) squares changed since the last call to
+              pop_changes, or None if changes are not tracked. A square is
+              kept once however often it changes, so the set never holds
+              more than the board's squares.
+    _random: The random module, or a seeded random.Random, for apples.
+    _seed: The seed of the current game, or None.
     _direction: A list for current direction of motion referring to
-                _board_array indices.
+                _grid indices.
+    _direction_code: Integer index of _direction in DIRECTIONS, or None if
+                     the snake is not moving in one of them.
     """
     direction2angle = {
         (1,0): 0,
@@ -31,55 +73,122 @@ class GameBoard:
         (0,-1): 3 * np.pi / 2,
     }
 
-    def __init__(self, side):
+    def __init__(self, side, seed=None):
         """
         Initializes GameBoard with Snake in center, a randomly spawned
         Apple, Border, and Blank instances.
 
         Args:
             side: An integer length of GameBoard. Includes borders.
+            seed: Optional seed for the apple positions of this board. The
+                  random module is used if no seed is given.
         """
-        self._end_condition = False
         self._size = side
-        self._direction = [1, 0]  # Delta row, delta column
-        self._board_array = [[Blank() for _ in range(self._size)]
-                             for _ in range(self._size)]
+        self._grid = np.full((self._size, self._size), BLANK, dtype=np.int8)
+        self._grid[0, :] = BORDER
+        self._grid[-1, :] = BORDER
+        self._grid[:, 0] = BORDER
+        self._grid[:, -1] = BORDER
+        self._reset_free()
 
-        for index in range(0, self.size):
-            for value in [0, self.size - 1]:
-                self.mark_square([index, value], Border())
-                self.mark_square([value, index], Border())
+        self._snake = deque()
+        self._apple = None
+        self._marked = False
+        self._changes = None
+        self._random = random
+        self.reset(seed)
 
-        snake_location = [math.ceil(self._size / 2), math.ceil(self._size / 2)]
-        self._snake = [snake_location]
-        self.mark_square(snake_location, Snake())
+    def reset(self, seed=None):
+        """
+        Restores the board to its initial state in place for a new game.
 
-        apple_location = self.choose_apple_square()
-        self._apple = apple_location
-        self.mark_square(apple_location, Apple())
+        Only the squares of the old snake and apple are cleared, so the grid
+        and free-cell index are reused instead of being rebuilt. If changes
+        are tracked, the squares changed during the old game are replaced by
+        every square inside the borders, so views draw the new game in full.
 
+        Args:
+            seed: Optional seed for the apple positions of the new game. If
+                  no seed is given, the board keeps its current generator.
+        """
+        if seed is not None:
+            self._random = random.Random(seed)
+        self._seed = seed
+
+        inner_squares = (self._size - 2) ** 2
+        if not self._marked and len(self._free) + len(self._snake) + \
+                (self._apple is not None) == inner_squares:
+            for location in self._snake:
+                self._mark_code(location, BLANK)
+            if self._apple is not None:
+                self._mark_code(self._apple, BLANK)
+        else:
+            # Squares were marked outside of the game, so clear everything
+            self._grid[1:-1, 1:-1] = BLANK
+            self._reset_free()
+            self._marked = False
+        if self._changes is not None:
+            self._changes = {(row, col)
+                             for row in range(1, self._size - 1)
+                             for col in range(1, self._size - 1)}
 
+        self._end_condition = False
+        self._direction = [1, 0]  # Delta row, delta column
+        self._direction_code = DIRECTION_CODES[(1, 0)]
 
+        snake_location = [math.ceil(self._size / 2), math.ceil(self._size / 2)]
+        self._snake.clear()
+        self._snake.append(snake_location)
+        self._mark_code(snake_location, SNAKE)
 
-    def __repr__(self):
+        self._apple = None
+        self.spawn_apple()
+
+    def _reset_free(self):
+        """
+        Rebuilds the free-cell index from _grid.
         """
-        Iterates through GameBoard to represent each square as part of string.
+        self._free = np.flatnonzero(self._grid == BLANK).tolist()
+        self._free_slot = [-1] * (self._size * self._size)
+        for slot, flat_index in enumerate(self._free):
+            self._free_slot[flat_index] = slot
+
+    def __repr__(self):
         """
-        repr_string = ""
+        Represent each square as a character, with one line per row.
 
-        for row in self.board_array:
-            str_temp = ""
-            for item in row:
-                str_temp += repr(item)
-            repr_string += str_temp + "\n"
-        return repr_string
+        The grid bytes are translated to characters in one call instead of
+        calling repr on every square.
+        """
+        chars = self._grid.tobytes().decode("latin-1").translate(
+            CELL_TRANSLATION)
+        return "".join(chars[start:start + self._size] + "\n"
+                       for start in range(0, len(chars), self._size))
 
     @property
     def board_array(self):
         """
-        Return 2D-list _board_array.
+        Return 2D list of Object instances built from the cell codes in _grid.
+
+        The Object instances are shared between squares, so this is only a
+        view of the board and marking squares should go through mark_square.
+        """
+        return [[CELL_OBJECTS[code] for code in row]
+                for row in self._grid.tolist()]
+
+    @property
+    def seed(self):
+        """
+        Return the seed the current game was started with, or None.
         """
-        return self._board_array
+        return self._seed
+
+    @property
+    def grid(self):
+        """
+        Return 2D int8 NumPy array _grid of cell codes.
+        """
+        return self._grid
 
     @property
     def size(self):
@@ -95,6 +204,13 @@ class GameBoard:
         """
         return self._direction
 
+    @property
+    def direction_code(self):
+        """
+        Return integer code of current snake direction, or None.
+        """
+        return self._direction_code
+
     @property
     def angular_direction(self):
         """
@@ -119,9 +235,33 @@ class GameBoard:
     @property
     def snake(self):
         """
-        Return list of two-element lists for snake locations.
+        Return a new list of two-element lists for snake locations.
+
+        Building the list takes time proportional to the snake length, so
+        code that runs every step should use head, tail or iter_snake.
+        """
+        return list(self._snake)
+
+    def iter_snake(self):
+        """
+        Return an iterator over the snake locations from head to tail
+        without copying them. The board must not move while it is used.
         """
-        return self._snake
+        return iter(self._snake)
+
+    @property
+    def head(self):
+        """
+        Return two-element list for snake head location.
+        """
+        return self._snake[0]
+
+    @property
+    def tail(self):
+        """
+        Return two-element list for snake tail location.
+        """
+        return self._snake[-1]
     
     @property
     def apple(self):
@@ -131,20 +271,26 @@ class GameBoard:
         return self._apple
     
     
+    @property
+    def free_squares(self):
+        """
+        Return integer number of Blank squares left on the board.
+        """
+        return len(self._free)
+
     @property
     def surrounding_squares(self):
         """
-        Convoluted way to get all of the directions, but oh well, it's a MATLAB moment.
+        Return the squares next to the head, in the order of DIRECTIONS.
         """
-        angles = [math.pi / 2 * i for i in range(4)]
-        positions = [[int(self.snake[0][0] + math.cos(angle)),
-                      int(self.snake[0][1] + math.sin(angle))] for angle in angles]
-        return positions  
-        
+        head = self.head
+        return [[head[0] + delta_row, head[1] + delta_col]
+                for delta_row, delta_col in DIRECTIONS]
+
     @property
     def surrounding_empty(self):
         positions = self.surrounding_squares
-        return [(isinstance(self.get_square(position), Blank) or isinstance(self.get_square(position), Apple)) for position in positions]
+        return [not self.is_blocked(position) for position in positions]
 
     @property
     def surrounding_to_apple(self):
@@ -154,7 +300,8 @@ class GameBoard:
     @property
     def surrounding_apple(self):
         positions = self.surrounding_squares
-        return [isinstance(self.get_square(position), Apple) for position in positions]
+        return [self._grid[position[0], position[1]] == APPLE
+                for position in positions]
 
     @property
     def markov_state(self):
@@ -175,46 +322,52 @@ class GameBoard:
         return np.array([[c, -s], [s, c]])
 
     def vec2snakeframe(self, vec):
-        pass
+        """
+        Returns the signs of vec rotated into the snake's frame of reference.
+
+        Uses the integer rotation in FRAME_ROTATIONS for the current direction,
+        so each coordinate is exactly -1, 0 or 1.
+
+        Args:
+            vec: Two-element integer list in (delta row, delta col) format.
+        """
+        if self._direction_code is None:
+            return [0, 0]
+        (r_00, r_01), (r_10, r_11) = FRAME_ROTATIONS[self._direction_code]
+        coord_x = r_00 * vec[0] + r_01 * vec[1]
+        coord_y = r_10 * vec[0] + r_11 * vec[1]
+        return [(coord_x > 0) - (coord_x < 0), (coord_y > 0) - (coord_y < 0)]
 
     @property
     def surrounding_walls(self):
         """
         Returns if wall to left, straight, and right in logic array.
         """
-        direction = np.array(self.direction)
-        snake_head = np.array(self.snake[0])
-        angles = np.array([math.pi / 2, 0, -math.pi / 2])
-        squares = np.array([snake_head + self.R_angle(angle) @ direction\
-                            for angle in angles]).astype(int)
-        return [isinstance((self.get_square(square)), Border) \
-            or isinstance((self.get_square(square)), Snake)
-                            for square in squares]
-    
+        if self._direction_code is None:
+            return [self.is_blocked(self.head)] * 3
+        head = self.head
+        return [self.is_blocked([head[0] + delta_row, head[1] + delta_col])
+                for delta_row, delta_col in TURN_OFFSETS[self._direction_code]]
+
     @property
     def relative_apple(self):
         """
+        Returns the direction of the apple in the snake's frame of reference.
         """
-        if self.direction == [0,0]:
-            return [0,0]
-        snake_head = np.array(self.snake[0])
-        apple = np.array(self.apple)
-        location = self.R_angle(self.angular_direction) @ np.ndarray.tolist(apple - snake_head)
-        direction = [coord / abs(coord) if coord != 0 else 0 for coord in location]
-        return direction
-
+        if self.apple is None:
+            return [0, 0]
+        head = self.head
+        return self.vec2snakeframe([self.apple[0] - head[0],
+                                    self.apple[1] - head[1]])
 
     @property
     def relative_tail(self):
         """
+        Returns the direction of the tail in the snake's frame of reference.
         """
-        if self.direction == [0,0]:
-            return [0,0]
-        snake_head = np.array(self.snake[0])
-        snake_tail = np.array(self.snake[-1])
-        location = self.R_angle(self.angular_direction) @ np.ndarray.tolist(snake_tail - snake_head)
-        direction = [coord / abs(coord) if coord != 0 else 0 for coord in location]
-        return direction
+        head = self.head
+        tail = self.tail
+        return self.vec2snakeframe([tail[0] - head[0], tail[1] - head[1]])
 
     def change_direction(self, direction):
         """
@@ -226,6 +379,27 @@ class GameBoard:
                        [-1,0], [0,1], or [0,-1].
         """
         self._direction = direction
+        self._direction_code = DIRECTION_CODES.get(tuple(direction))
+
+    def turn(self, turn):
+        """
+        Turns the snake relative to its current direction.
+
+        The snake must be moving in one of DIRECTIONS, so after
+        change_direction is given any other direction, the next move has to
+        set an absolute direction with change_direction again.
+
+        Args:
+            turn: An integer that is 1 to turn left, 0 to go straight, or -1
+                  to turn right.
+        Raises:
+            ValueError: If the snake has no direction code to turn from.
+        """
+        if self._direction_code is None:
+            raise ValueError(f"Cannot turn from direction {self._direction}, "
+                             "set one of DIRECTIONS with change_direction")
+        self.change_direction(
+            list(DIRECTIONS[(self._direction_code + turn) % 4]))
 
     def check_next_square(self):
         """
@@ -233,41 +407,42 @@ class GameBoard:
         interaction will result in maintained velocity, increased length,
         or game over.
         """
-        snake_head = self.snake[0]
-        self.board_array[(snake_head[0] + self.direction[0])] \
-                        [(snake_head[1] + self.direction[1])].interaction(self)
+        snake_head = self.head
+        CELL_OBJECTS[self._grid[snake_head[0] + self.direction[0],
+                                snake_head[1] + self.direction[1]]] \
+            .interaction(self)
 
     def maintain_velocity(self):
         """
         Moves snake one block forward.
 
-        Removes last Snake entry and adds new Snake instance to front.
+        Clears the last Snake square and marks a new Snake square in front.
         Interaction is called when next square is Blank instance.
         """
         # Set up rows and cols to access
-        next_square = [(self.snake[0][0] + self.direction[0]),
-                       (self.snake[0][1] + self.direction[1])]
+        next_square = [(self.head[0] + self.direction[0]),
+                       (self.head[1] + self.direction[1])]
         last_square = self._snake.pop()
         # Mark appropriate squares
-        self.mark_square(last_square, Blank())
-        self.mark_square(next_square, Snake())
+        self._mark_code(last_square, BLANK)
+        self._mark_code(next_square, SNAKE)
         # Update snake list
-        self._snake = [next_square] + self._snake
+        self._snake.appendleft(next_square)
 
     def increase_length(self):
         """
         Moves snake one block forward and increases length by one.
 
-        Changes adds new Snake instance in front. Interaction is called when
-        next square is Apple instance.
+        Marks a new Snake square in front. Interaction is called when next
+        square is Apple instance.
         """
         # Set up rows and cols to access
-        next_square = [(self.snake[0][0] + self.direction[0]),
-                       (self.snake[0][1] + self.direction[1])]
+        next_square = [(self.head[0] + self.direction[0]),
+                       (self.head[1] + self.direction[1])]
         # Mark appropriate squares
-        self.mark_square(next_square, Snake())
+        self._mark_code(next_square, SNAKE)
         # Update snake list
-        self._snake = [next_square] + self._snake
+        self._snake.appendleft(next_square)
         # Make new apple
         self.spawn_apple()
 
@@ -275,22 +450,27 @@ class GameBoard:
         """
         Returns index of Blank instance to turn into an Apple instance.
 
+        The square is picked uniformly from the free-cell index, or None is
+        returned if no Blank square is left.
         """
-        blank_indexes = []
-
-        for row,col in enumerate(range(self.size)):
-            if isinstance(self.get_square([row,col]), Blank):
-                blank_indexes.append([row, col])
+        if not self._free:
+            return None
+        flat_index = self._random.choice(self._free)
+        return [flat_index // self._size, flat_index % self._size]
 
-        return random.choice(blank_indexes)
-    
     def spawn_apple(self):
         """
-        Returns index of Blank instance to turn into an Apple instance.
+        Turns a random Blank square into an Apple instance.
+
+        If the snake fills every square there is nowhere left for an apple,
+        so the game ends.
         """
         apple_location = self.choose_apple_square()
         self._apple = apple_location
-        self.mark_square(apple_location, Apple())
+        if apple_location is None:
+            self.game_over()
+            return
+        self._mark_code(apple_location, APPLE)
         
     def toward_apple(self, next_square):
         """
@@ -299,11 +479,10 @@ class GameBoard:
         Args:
             next: A two-item tuple for a location on the board.
         """
-        snake = np.array(self.snake[0])
-        apple = np.array(self.apple)
-        next_square = np.array(next_square)
-        return np.linalg.norm(snake - apple) > np.linalg.norm(next_square - apple)
-   
+        head = self.head
+        apple = self.apple
+        return (head[0] - apple[0]) ** 2 + (head[1] - apple[1]) ** 2 > \
+            (next_square[0] - apple[0]) ** 2 + (next_square[1] - apple[1]) ** 2
 
     def game_over(self):
         """
@@ -321,26 +500,90 @@ class GameBoard:
         Args:
             location: Two-element integer list in (row, col) format.
         """
-        return self.board_array[location[0]][location[1]]
+        return CELL_OBJECTS[self._grid[location[0], location[1]]]
+
+    def track_changes(self):
+        """
+        Starts recording every square whose cell code changes, so views can
+        redraw only those squares.
+        """
+        if self._changes is None:
+            self._changes = set()
+
+    def pop_changes(self):
+        """
+        Returns the set of (row, col) squares changed since the last call
+        and starts a new set. Returns an empty set if changes are not
+        tracked.
+        """
+        if self._changes is None:
+            return set()
+        changes, self._changes = self._changes, set()
+        return changes
+
+    def is_blocked(self, location):
+        """
+        Returns True if moving into location would end the game.
+
+        Args:
+            location: Two-element integer list in (row, col) format.
+        """
+        return self._grid[location[0], location[1]] in (BORDER, SNAKE)
 
     def mark_square(self, location, object_type):
         """
         Changes the Object in specified location.
 
+        Squares marked this way are not part of the snake or apple the game
+        tracks, so the next reset clears the whole board.
+
         Args:
             location: Two-element integer list in (row, col) format.
             object_type: An instance of inheritor of Object.
         """
-        self._board_array[location[0]][location[1]] = object_type
+        self._marked = True
+        self._mark_code(location, object_type.code)
+
+    def _mark_code(self, location, code):
+        """
+        Changes the cell code in specified location.
+
+        Args:
+            location: Two-element integer list in (row, col) format.
+            code: One of the integer cell codes BLANK, BORDER, SNAKE or APPLE.
+        """
+        row, col = location[0], location[1]
+        old_code = self._grid[row, col]
+        self._grid[row, col] = code
+        if self._changes is not None:
+            self._changes.add((row, col))
+        if (old_code == BLANK) == (code == BLANK):
+            return
+
+        flat_index = row * self._size + col
+        if code == BLANK:
+            self._free_slot[flat_index] = len(self._free)
+            self._free.append(flat_index)
+        else:
+            # Swap-remove: move the last free square into the vacated slot
+            slot = self._free_slot[flat_index]
+            last_index = self._free.pop()
+            if last_index != flat_index:
+                self._free[slot] = last_index
+                self._free_slot[last_index] = slot
+            self._free_slot[flat_index] = -1
 
 
 class Object(ABC):
     """
-    Object instances fill the squares of 2D-list _board_array in GameBoard.
+    Object instances represent the squares of _grid in GameBoard.
 
     Attributes:
+        code: Integer cell code used for this Object in GameBoard._grid.
         _color: Tuple with three integers between 0 and 255. Format: (R, G, B)
     """
+    code = None
+
     def __init__(self):
         self._color = (0,0,0)
 
@@ -367,7 +610,7 @@ class Object(ABC):
 
 class Apple(Object):
     """
-    Apple is an Object in 2D-list _board_array in GameBoard.
+    Apple is an Object in _grid in GameBoard.
 
     There is one apple per GameBoard instance at a time. When the apple is
     consumed, a new one will be spawned. Interacting with the apple increases
@@ -376,6 +619,7 @@ class Apple(Object):
     Attributes:
         _color: Tuple with three integers between 0 and 255. Format: (R, G, B)
     """
+    code = APPLE
 
     def __init__(self):
 
@@ -416,11 +660,12 @@ class Apple(Object):
 
 class Blank(Object):
     """
-    Blank is an Object in squares of 2D-list _board_array in GameBoard.
+    Blank is an Object in squares of _grid in GameBoard.
 
     Attributes:
         _color: Tuple with three integers between 0 and 255. Format: (R, G, B)
     """
+    code = BLANK
 
     def __init__(self):
         """
@@ -460,7 +705,7 @@ class Blank(Object):
 
 class Border(Object):
     """
-    Border is an Object in 2D-list _board_array in GameBoard.
+    Border is an Object in _grid in GameBoard.
 
     All edges of the board (i.e. items with index that is 0 or size - 1) are
     Border instances. Interacting with a Border ends the game.
@@ -468,6 +713,7 @@ class Border(Object):
     Attributes:
         _color: Tuple with three integers between 0 and 255. Format: (R, G, B)
     """
+    code = BORDER
 
     def __init__(self):
         """
@@ -507,7 +753,7 @@ class Border(Object):
 
 class Snake(Object):
     """
-    Snake is an Object in 2D-list _board_array in GameBoard.
+    Snake is an Object in _grid in GameBoard.
 
     The first Snake instance is spawned at the center of the board. From there,
     it will move and create more Snake instances when interacting with Apple.
@@ -516,6 +762,8 @@ class Snake(Object):
     Attributes:
         _color: Tuple with three integers between 0 and 255. Format: (R, G, B)
     """
+    code = SNAKE
+
     def __init__(self):
         """
         Create a new instance of Snake.
@@ -550,3 +798,13 @@ class Snake(Object):
         """
         """
         return self._reward
+
+
+# Shared Object instance for each cell code, indexed by the code.
+CELL_OBJECTS = (Blank(), Border(), Snake(), Apple())
+
+# Character for each cell code, indexed by the code.
+CELL_CHARS = tuple(repr(obj) for obj in CELL_OBJECTS)
+
+# str.translate table from the bytes of _grid to the cell characters.
+CELL_TRANSLATION = {code: char for code, char in enumerate(CELL_CHARS)}
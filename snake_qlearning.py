@@ -0,0 +1,396 @@
+"""
+This module contains a tabular Q-learning and SARSA engine for the snake
+agent. Unlike RLPlayer, which averages the immediate reward of each state and
+action, the QLearner bootstraps from the value of the next state, so rewards
+propagate back through the moves that led to them.
+
+The QLearner uses the same 648 states (see snake_qtable) and the same actions
+as RLPlayer, and applies updates from many transitions at once, so it can
+learn from all games of a VecGameBoard in one call per step. A trained
+QLearner converts to a QTable, which RLPlayer can play with and which is
+saved in the usual agent formats.
+"""
+
+import argparse
+import numpy as np
+from snake_qtable import NUM_STATES, QTable, encode_states
+from snake_vec import VecGameBoard
+from snake_controller import RLPlayer
+
+
+class Constant:
+    """
+    Schedule that keeps the same value for every episode.
+
+    Attributes:
+        _value: a float for the value of the schedule
+    """
+
+    def __init__(self, value):
+        self._value = value
+
+    def __call__(self, episode):
+        """
+        Return the value of the schedule for an episode number.
+        """
+        return self._value
+
+
+class ExponentialDecay:
+    """
+    Schedule that starts at a value and is multiplied by rate after every
+    episode, never going below minimum.
+
+    Attributes:
+        _start: a float for the value of the first episode
+        _rate: a float for the factor applied after every episode
+        _minimum: a float for the smallest value of the schedule
+    """
+
+    def __init__(self, start, rate, minimum=0.0):
+        self._start = start
+        self._rate = rate
+        self._minimum = minimum
+
+    def __call__(self, episode):
+        """
+        Return the value of the schedule for an episode number.
+        """
+        return max(self._minimum, self._start * self._rate ** episode)
+
+
+class LinearDecay:
+    """
+    Schedule that moves in a straight line from start to end over a number
+    of episodes and then stays at end. A decay over no episodes is already
+    at end.
+
+    Attributes:
+        _start: a float for the value of the first episode
+        _end: a float for the value after the decay
+        _episodes: an int for the number of episodes the decay takes
+    """
+
+    def __init__(self, start, end, episodes):
+        self._start = start
+        self._end = end
+        self._episodes = episodes
+
+    def __call__(self, episode):
+        """
+        Return the value of the schedule for an episode number.
+        """
+        if self._episodes <= 0:
+            fraction = 1.0
+        else:
+            fraction = min(1.0, episode / self._episodes)
+        return self._start + fraction * (self._end - self._start)
+
+
+def as_schedule(value):
+    """
+    Return value if it is a schedule, and a Constant schedule otherwise.
+    """
+    return value if callable(value) else Constant(value)
+
+
+class QLearner:
+    """
+    Tabular action values for each state, learned with Q-learning or SARSA
+    from batches of transitions.
+
+    The learning rate, discount and exploration rate are schedules of the
+    number of finished episodes, so they can decay as the agent improves.
+
+    Attributes:
+        _q: a float array of shape (NUM_STATES, 3) with the value of each
+        state and action
+        _visits: an int array of shape (NUM_STATES, 3) with the number of
+        updates of each state and action
+        _alpha: the learning rate schedule
+        _gamma: the discount schedule
+        _epsilon: the exploration rate schedule
+        _sarsa: a boolean for whether to bootstrap from the next action taken
+        instead of the best next action
+        _episodes: an int for the number of finished episodes
+        _rng: a NumPy random Generator used to explore and break ties
+    """
+    num_actions = len(RLPlayer.key_turn)
+
+    def __init__(self, alpha=0.1, gamma=0.9, epsilon=0.0, sarsa=False,
+                 initial_value=0.0, seed=None):
+        """
+        Initialize every action value to initial_value
+
+        Args:
+            alpha: a float or schedule for the learning rate
+            gamma: a float or schedule for the discount of the next state
+            epsilon: a float or schedule for the probability of a random
+            action
+            sarsa: a boolean, True for SARSA and False for Q-learning
+            initial_value: a float for the starting value of every action
+            seed: an optional seed for exploring and breaking ties
+        Returns:
+            No return value
+        """
+        self._q = np.full((NUM_STATES, self.num_actions), initial_value,
+                          dtype=np.float64)
+        self._visits = np.zeros((NUM_STATES, self.num_actions),
+                                dtype=np.int64)
+        self._alpha = as_schedule(alpha)
+        self._gamma = as_schedule(gamma)
+        self._epsilon = as_schedule(epsilon)
+        self._sarsa = sarsa
+        self._episodes = 0
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_table(cls, table, **kwargs):
+        """
+        Return a learner starting from the average rewards of a QTable
+
+        Args:
+            table: a QTable
+            kwargs: the keyword arguments of QLearner
+        Returns:
+            a QLearner
+        """
+        learner = cls(**kwargs)
+        learner.q[:] = table.values()
+        learner.visits[:] = table.counts
+        return learner
+
+    @property
+    def q(self):
+        """
+        Return the array of action values, which is a private attribute
+        """
+        return self._q
+
+    @property
+    def visits(self):
+        """
+        Return the array of update counts, which is a private attribute
+        """
+        return self._visits
+
+    @property
+    def episodes(self):
+        """
+        Return the number of finished episodes
+        """
+        return self._episodes
+
+    @property
+    def alpha(self):
+        """
+        Return the learning rate for the current episode
+        """
+        return self._alpha(self._episodes)
+
+    @property
+    def gamma(self):
+        """
+        Return the discount for the current episode
+        """
+        return self._gamma(self._episodes)
+
+    @property
+    def epsilon(self):
+        """
+        Return the exploration rate for the current episode
+        """
+        return self._epsilon(self._episodes)
+
+    def greedy(self, states):
+        """
+        Return the action with the highest value, breaking ties at random
+
+        Args:
+            states: an int state index or an int array of state indices
+        Returns:
+            an int action for a single state, or an int array of actions
+        """
+        values = self._q[states]
+        best = values == values.max(axis=-1, keepdims=True)
+        return np.argmax(best * self._rng.random(best.shape), axis=-1)
+
+    def act(self, states):
+        """
+        Return a random action with probability epsilon, and otherwise the
+        greedy action, for every state
+
+        Args:
+            states: an int array of state indices
+        Returns:
+            an int array of actions
+        """
+        actions = self.greedy(states)
+        epsilon = self.epsilon
+        if epsilon > 0:
+            explore = self._rng.random(len(actions)) < epsilon
+            actions[explore] = self._rng.integers(
+                self.num_actions, size=int(explore.sum()))
+        return actions
+
+    def update_many(self, states, actions, rewards, next_states, dones,
+                    next_actions=None):
+        """
+        Move the value of every state and action toward its temporal
+        difference target in one batched update
+
+        The target is the reward plus the discounted value of the next state,
+        which is the best next action for Q-learning and next_actions for
+        SARSA, and the reward alone when the game ended. All targets are
+        computed from the values before the update, and repeated state and
+        action pairs move toward the mean of their targets.
+
+        Args:
+            states: an int array of state indices
+            actions: an int array of action indices
+            rewards: a float array of rewards
+            next_states: an int array of the state indices after each action
+            dones: a boolean array marking the transitions that ended a game
+            next_actions: an int array of the actions taken in next_states,
+            required for SARSA
+        Returns:
+            No return value
+        """
+        if self._sarsa:
+            if next_actions is None:
+                raise ValueError("SARSA updates need next_actions")
+            next_values = self._q[next_states, next_actions]
+        else:
+            next_values = self._q[next_states].max(axis=1)
+        targets = rewards + self.gamma * np.where(dones, 0.0, next_values)
+        errors = targets - self._q[states, actions]
+
+        flat = states * self.num_actions + actions
+        size = NUM_STATES * self.num_actions
+        error_sums = np.bincount(flat, weights=errors, minlength=size)
+        counts = np.bincount(flat, minlength=size)
+        touched = counts > 0
+        self._q.reshape(-1)[touched] += \
+            self.alpha * error_sums[touched] / counts[touched]
+        self._visits.reshape(-1)[:] += counts
+
+    def update(self, state, action, reward, next_state, done,
+               next_action=None):
+        """
+        Learn from a single transition, see update_many
+
+        Args:
+            state: an int state index
+            action: an int action index
+            reward: a float reward
+            next_state: an int state index after the action
+            done: a boolean for whether the action ended the game
+            next_action: an int action taken in next_state, required for
+            SARSA
+        Returns:
+            No return value
+        """
+        self.update_many(np.array([state]), np.array([action]),
+                         np.array([reward], dtype=np.float64),
+                         np.array([next_state]), np.array([done]),
+                         None if next_action is None
+                         else np.array([next_action]))
+
+    def episode_done(self, count=1):
+        """
+        Count finished episodes, which advances the schedules
+
+        Args:
+            count: an int for the number of episodes that finished
+        Returns:
+            No return value
+        """
+        self._episodes += int(count)
+
+    def to_table(self):
+        """
+        Return the action values as a QTable, whose average rewards are the
+        action values, so RLPlayer plays the greedy policy of the learner
+
+        Args:
+            None
+        Returns:
+            a QTable
+        """
+        return QTable(self._q.copy(), np.ones_like(self._q))
+
+
+def train_vectorized(learner, episodes, num_games=64, side=20, seed=None,
+                     max_steps=None):
+    """
+    Train a learner on many games at once until enough games have finished
+
+    Every step, each game of a VecGameBoard moves, and all the transitions
+    are learned from in one batched update. The rewards are those of
+    RLPlayer: the reward of the next square plus 0.05 for moving toward the
+    apple.
+
+    Args:
+        learner: the QLearner to train
+        episodes: an int for the number of games to finish
+        num_games: an int for the number of games played side by side
+        side: an int for the side length of the boards
+        seed: an optional seed for the random apples
+        max_steps: an optional int for the most steps to take
+    Returns:
+        lengths: a list of the final snake length of each finished game
+    """
+    boards = VecGameBoard(num_games, side, seed)
+    key_turn = np.array(RLPlayer.key_turn)
+    states = encode_states(*boards.rl_state)
+    actions = learner.act(states)
+    lengths = []
+    steps = 0
+    while len(lengths) < episodes and (max_steps is None or steps < max_steps):
+        boards.turn(key_turn[actions])
+        shaping = np.where(boards.toward_apple(), 0.05, 0.0)
+        rewards, dones = boards.check_next_square()
+
+        next_states = encode_states(*boards.rl_state)
+        next_actions = learner.act(next_states)
+        learner.update_many(states, actions, rewards + shaping, next_states,
+                            dones, next_actions)
+        if dones.any():
+            finished = boards.final_lengths[dones].tolist()
+            lengths.extend(finished)
+            learner.episode_done(len(finished))
+        states, actions = next_states, next_actions
+        steps += 1
+    return lengths[:episodes]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--episodes", type=int, default=2000,
+                        help="number of games to finish")
+    parser.add_argument("--games", type=int, default=64,
+                        help="number of games played side by side")
+    parser.add_argument("--alpha", type=float, default=0.1,
+                        help="learning rate")
+    parser.add_argument("--gamma", type=float, default=0.9,
+                        help="discount of the next state")
+    parser.add_argument("--epsilon", type=float, default=0.1,
+                        help="starting exploration rate, decayed to zero")
+    parser.add_argument("--sarsa", action="store_true",
+                        help="learn with SARSA instead of Q-learning")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed for apples and exploration")
+    parser.add_argument("--agent", default=None,
+                        help="path to save the agent to, e.g. snake_q.csv")
+    args = parser.parse_args()
+
+    q_learner = QLearner(args.alpha, args.gamma,
+                         LinearDecay(args.epsilon, 0.0, args.episodes // 2),
+                         args.sarsa, seed=args.seed)
+    final_lengths = train_vectorized(q_learner, args.episodes, args.games,
+                                     seed=args.seed)
+    tail = final_lengths[-max(1, len(final_lengths) // 10):]
+    print(f"Played {len(final_lengths)} games, mean length of the last "
+          f"{len(tail)} games {np.mean(tail):.2f}")
+    if args.agent is not None:
+        q_learner.to_table().write(args.agent)
@@ -0,0 +1,438 @@
+"""
+This module maps the reinforcement learning state of a GameBoard (see
+GameBoard.rl_state) to an integer index, so agent tables can be addressed by
+arithmetic instead of searching for a matching row. It also contains the
+QTable class that stores an agent in NumPy arrays addressed by that index,
+and a binary agent format that can be memory-mapped.
+
+The index of a state is its row in the agent csv layout written by RLPlayer,
+where tail_x varies slowest and w_r fastest, with walls ordered True, False
+and directions ordered -1, 0, 1.
+
+The binary format is a 64 byte header followed by the reward sums and then
+the visit counts as little-endian float64 arrays of shape (NUM_STATES, 3).
+The header holds BINARY_MAGIC and four little-endian uint32 values: the
+format version, the state encoding version, the number of states and the
+number of actions. Running this module converts agents between the csv and
+binary formats.
+"""
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+BINARY_MAGIC = b"SNAKEQT\0"
+BINARY_VERSION = 1
+BINARY_EXTENSION = ".qtable"
+BINARY_HEADER_SIZE = 64
+
+# Version of the mapping from states to indices in this module, stored in
+# binary agents so a table is never read with a different encoding
+STATE_ENCODING = 1
+
+STATE_COLUMNS = ["w_l", "w_s", "w_r", "apple_x", "apple_y", "tail_x", "tail_y"]
+
+# Number of values each state column takes, in column order
+STATE_SHAPE = (2, 2, 2, 3, 3, 3, 3)
+
+NUM_STATES = int(np.prod(STATE_SHAPE))
+
+# Weight of each state column in the index. tail_x varies slowest, then
+# tail_y, apple_x, apple_y, w_l, w_s and w_r.
+STATE_WEIGHTS = np.array([4, 2, 1, 24, 8, 216, 72])
+
+
+def encode_state(walls, apple, tail):
+    """
+    Return the integer index in [0, NUM_STATES) of an rl_state.
+
+    Args:
+        walls: three booleans for a wall to the left, straight and right
+        apple: two integers in -1, 0 or 1 for the relative apple direction
+        tail: two integers in -1, 0 or 1 for the relative tail direction
+    Returns:
+        an int for the row of the state in the agent csv layout
+    """
+    return (216 * int(tail[0] + 1) + 72 * int(tail[1] + 1)
+            + 24 * int(apple[0] + 1) + 8 * int(apple[1] + 1)
+            + 4 * (not walls[0]) + 2 * (not walls[1]) + (not walls[2]))
+
+
+def encode_states(walls, apple, tail):
+    """
+    Return the integer index of many rl_states at once, e.g. the rl_state of
+    a VecGameBoard.
+
+    Args:
+        walls: a boolean array of shape (n, 3) for walls to the left,
+        straight and right
+        apple: an int array of shape (n, 2) for the relative apple directions
+        tail: an int array of shape (n, 2) for the relative tail directions
+    Returns:
+        an int array with the index of each state
+    """
+    walls = np.asarray(walls, dtype=np.int64)
+    apple = np.asarray(apple, dtype=np.int64) + 1
+    tail = np.asarray(tail, dtype=np.int64) + 1
+    return ((1 - walls) @ STATE_WEIGHTS[:3] + apple @ STATE_WEIGHTS[3:5] +
+            tail @ STATE_WEIGHTS[5:])
+
+
+def encode_rows(states):
+    """
+    Return the integer index of every row of an array of states.
+
+    Args:
+        states: an array with one row per state and the STATE_COLUMNS as
+        columns, as found in the agent csv
+    Returns:
+        an int array with the index of each row
+    """
+    states = np.asarray(states)
+    digits = np.empty(states.shape, dtype=np.int64)
+    digits[:, :3] = 1 - states[:, :3]
+    digits[:, 3:] = states[:, 3:] + 1
+    return digits @ STATE_WEIGHTS
+
+
+def decode_state(index):
+    """
+    Return the rl_state with the given integer index.
+
+    Args:
+        index: an int in [0, NUM_STATES)
+    Returns:
+        walls: a list of three booleans
+        apple: a list of two integers
+        tail: a list of two integers
+    """
+    row = state_table()[index]
+    return ([bool(value) for value in row[:3]], row[3:5].tolist(),
+            row[5:].tolist())
+
+
+def state_table():
+    """
+    Return an int array of every state with the STATE_COLUMNS as columns,
+    where row i is the state with index i.
+
+    Args:
+        None
+    Returns:
+        an int array of shape (NUM_STATES, 7)
+    """
+    indices = np.arange(NUM_STATES)
+    table = (indices[:, None] // STATE_WEIGHTS) % np.array(STATE_SHAPE)
+    table[:, :3] = 1 - table[:, :3]
+    table[:, 3:] -= 1
+    return table
+
+
+def canonical_order(states):
+    """
+    Return the permutation that sorts the rows of an agent table by index.
+
+    Args:
+        states: an array with one row per state and the STATE_COLUMNS as
+        columns
+    Returns:
+        an int array to reorder the rows with, so that row i holds state i
+    Raises:
+        ValueError: if the rows do not hold every state exactly once
+    """
+    indices = encode_rows(states)
+    if len(indices) != NUM_STATES or \
+            not np.array_equal(np.sort(indices), np.arange(NUM_STATES)):
+        raise ValueError("agent table must hold every state exactly once")
+    return np.argsort(indices)
+
+
+class QTable:
+    """
+    Agent table of running reward sums and visit counts for each state and
+    action, stored in contiguous NumPy arrays addressed by state index.
+
+    The actions are the columns of the agent csv: l, s and r.
+
+    Attributes:
+        _q_sums: a float array of shape (NUM_STATES, 3) with the sum of the
+        rewards received for each state and action
+        _counts: a float array of shape (NUM_STATES, 3) with the number of
+        times each state and action was visited
+        _rng: a NumPy random Generator used to break ties
+    """
+    q_columns = ["Q_k_l", "Q_k_s", "Q_k_r"]
+    k_columns = ["k_l", "k_s", "k_r"]
+    column_names = STATE_COLUMNS + ["Q_k_l", "k_l", "Q_k_s", "k_s",
+                                    "Q_k_r", "k_r"]
+
+    num_actions = 3
+
+    def __init__(self, q_sums, counts, seed=None):
+        """
+        Initialize the table from arrays of reward sums and visit counts
+
+        Args:
+            q_sums: an array of shape (NUM_STATES, 3) of reward sums
+            counts: an array of shape (NUM_STATES, 3) of visit counts
+            seed: an optional seed for breaking ties between actions
+        Returns:
+            No return value
+        """
+        self._q_sums = np.ascontiguousarray(q_sums, dtype=np.float64)
+        self._counts = np.ascontiguousarray(counts, dtype=np.float64)
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def new(cls, initial_reward, seed=None):
+        """
+        Return a table where every action has been seen once with a reward of
+        initial_reward
+
+        Args:
+            initial_reward: a float for the starting value of every action
+            seed: an optional seed for breaking ties between actions
+        Returns:
+            a QTable
+        """
+        shape = (NUM_STATES, cls.num_actions)
+        return cls(np.full(shape, initial_reward, dtype=np.float64),
+                   np.ones(shape), seed)
+
+    @classmethod
+    def from_dataframe(cls, df, seed=None):
+        """
+        Return a table built from a DataFrame in the agent csv layout. The
+        rows may be in any order.
+
+        Args:
+            df: a pandas DataFrame with the QTable.column_names as columns
+            seed: an optional seed for breaking ties between actions
+        Returns:
+            a QTable
+        """
+        order = canonical_order(df[STATE_COLUMNS].to_numpy())
+        return cls(df[cls.q_columns].to_numpy()[order],
+                   df[cls.k_columns].to_numpy()[order], seed)
+
+    @classmethod
+    def from_csv(cls, path, seed=None):
+        """
+        Return a table loaded from an agent csv
+
+        Args:
+            path: a string path to the agent csv
+            seed: an optional seed for breaking ties between actions
+        Returns:
+            a QTable
+        """
+        return cls.from_dataframe(pd.read_csv(path), seed)
+
+    @classmethod
+    def load(cls, path, mmap_mode="c", seed=None):
+        """
+        Return a table memory-mapped from a binary agent file, so loading
+        does not read or parse the whole file
+
+        Args:
+            path: a string path to the binary agent
+            mmap_mode: "c" to keep updates in memory, "r+" to write updates
+            through to the file, or "r" for a read-only table
+            seed: an optional seed for breaking ties between actions
+        Returns:
+            a QTable
+        Raises:
+            ValueError: if the file is not a binary agent for this version of
+            the state encoding
+        """
+        with open(path, "rb") as file:
+            header = file.read(BINARY_HEADER_SIZE)
+        fields = np.frombuffer(header, dtype="<u4", count=4,
+                               offset=len(BINARY_MAGIC))
+        if not header.startswith(BINARY_MAGIC) or \
+                fields.tolist() != [BINARY_VERSION, STATE_ENCODING,
+                                    NUM_STATES, cls.num_actions]:
+            raise ValueError(f"{path} is not a version {BINARY_VERSION} "
+                             "binary agent")
+
+        data = np.memmap(path, dtype="<f8", mode=mmap_mode,
+                         offset=BINARY_HEADER_SIZE,
+                         shape=(2, NUM_STATES, cls.num_actions))
+        return cls(data[0], data[1], seed)
+
+    @classmethod
+    def read(cls, path, seed=None):
+        """
+        Return a table from a binary agent if path ends in BINARY_EXTENSION,
+        and from an agent csv otherwise
+
+        Args:
+            path: a string path to the agent
+            seed: an optional seed for breaking ties between actions
+        Returns:
+            a QTable
+        """
+        if str(path).endswith(BINARY_EXTENSION):
+            return cls.load(path, seed=seed)
+        return cls.from_csv(path, seed)
+
+    @property
+    def q_sums(self):
+        """
+        Return the array of reward sums, which is a private attribute
+        """
+        return self._q_sums
+
+    @property
+    def counts(self):
+        """
+        Return the array of visit counts, which is a private attribute
+        """
+        return self._counts
+
+    def values(self, states=None):
+        """
+        Return the average reward of each action
+
+        Args:
+            states: an optional int or int array of state indices, all states
+            by default
+        Returns:
+            a float array with the average reward of each action
+        """
+        if states is None:
+            return self._q_sums / self._counts
+        return self._q_sums[states] / self._counts[states]
+
+    def greedy(self, states):
+        """
+        Return the action with the highest average reward, breaking ties at
+        random
+
+        Args:
+            states: an int state index or an int array of state indices
+        Returns:
+            an int action for a single state, or an int array of actions
+        """
+        values = self.values(states)
+        best = values == values.max(axis=-1, keepdims=True)
+        return np.argmax(best * self._rng.random(best.shape), axis=-1)
+
+    def update(self, state, action, reward):
+        """
+        Add a reward to the running sum of a state and action and count the
+        visit
+
+        Args:
+            state: an int state index
+            action: an int action index
+            reward: a float reward
+        Returns:
+            No return value
+        """
+        self._q_sums[state, action] += reward
+        self._counts[state, action] += 1
+
+    def update_many(self, states, actions, rewards):
+        """
+        Add many rewards at once, accumulating repeated state and action pairs
+
+        Args:
+            states: an int array of state indices
+            actions: an int array of action indices
+            rewards: a float array of rewards
+        Returns:
+            No return value
+        """
+        np.add.at(self._q_sums, (states, actions), rewards)
+        np.add.at(self._counts, (states, actions), 1)
+
+    def to_dataframe(self):
+        """
+        Return the table as a DataFrame in the agent csv layout
+
+        Args:
+            None
+        Returns:
+            a pandas DataFrame with the QTable.column_names as columns
+        """
+        data = np.empty((NUM_STATES, len(self.column_names)))
+        data[:, :len(STATE_COLUMNS)] = state_table()
+        data[:, len(STATE_COLUMNS)::2] = self._q_sums
+        data[:, len(STATE_COLUMNS) + 1::2] = self._counts
+        return pd.DataFrame(data, columns=self.column_names)
+
+    def to_csv(self, path):
+        """
+        Write the table to an agent csv
+
+        Args:
+            path: a string path to write the agent csv to
+        Returns:
+            No return value
+        """
+        self.to_dataframe().to_csv(path, index=False)
+
+    def save(self, path):
+        """
+        Write the table to a binary agent file
+
+        The file is written next to path and then renamed over it, so a table
+        memory-mapped from path keeps reading the old file while it is saved.
+
+        Args:
+            path: a string path to write the binary agent to
+        Returns:
+            No return value
+        """
+        header = bytearray(BINARY_HEADER_SIZE)
+        header[:len(BINARY_MAGIC)] = BINARY_MAGIC
+        header[len(BINARY_MAGIC):len(BINARY_MAGIC) + 16] = np.array(
+            [BINARY_VERSION, STATE_ENCODING, NUM_STATES, self.num_actions],
+            dtype="<u4").tobytes()
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(header)
+            file.write(np.asarray(self._q_sums, dtype="<f8").tobytes())
+            file.write(np.asarray(self._counts, dtype="<f8").tobytes())
+        os.replace(temp_path, path)
+
+    def write(self, path):
+        """
+        Write the table as a binary agent if path ends in BINARY_EXTENSION,
+        and as an agent csv otherwise
+
+        Args:
+            path: a string path to write the agent to
+        Returns:
+            No return value
+        """
+        if str(path).endswith(BINARY_EXTENSION):
+            self.save(path)
+        else:
+            self.to_csv(path)
+
+
+def convert_agent(source, destination):
+    """
+    Convert an agent between the csv and binary formats, going by the
+    extension of each path
+
+    Args:
+        source: a string path to the agent to read
+        destination: a string path to write the agent to
+    Returns:
+        No return value
+    """
+    QTable.read(source).write(destination)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert an agent between the csv and binary formats")
+    parser.add_argument("source", help="agent to read, e.g. snake1.csv")
+    parser.add_argument("destination",
+                        help=f"agent to write, e.g. snake1{BINARY_EXTENSION}")
+    args = parser.parse_args()
+    convert_agent(args.source, args.destination)
@@ -0,0 +1,311 @@
+"""
+This module records snake games to disk without a display window. It
+includes the RecordingView class, a PygameView that draws the board onto an
+offscreen surface and streams every frame to an animated GIF or a sequence of
+PNG files, and a command line entry point that records games of a saved
+agent.
+
+Writing GIFs needs the Pillow library, which can be installed using
+`pip install pillow`. PNG sequences only need pygame.
+"""
+
+import argparse
+import os
+import queue
+import threading
+import pygame
+from snake_model import GameBoard, CELL_OBJECTS, SNAKE
+from snake_view import PygameView, RenderScheduler, TileAtlas
+from snake_controller import RLPlayer
+from snake_qtable import QTable
+
+try:
+    from PIL import Image, GifImagePlugin
+except ImportError:
+    Image = None
+
+
+class RecordingView(PygameView):
+    """
+    Class for recording the gameboard to a GIF or PNG sequence, which
+    inherits from PygameView
+
+    Frames are drawn onto an offscreen surface and handed to a background
+    writer thread through a bounded queue, so drawing never waits on the disk
+    unless the writer falls behind by max_queued frames, and memory use stays
+    bounded however long the recording is.
+
+    Attributes:
+        _path: a string path to the GIF, or to the directory of PNG files
+        _gif: a boolean for whether frames are written to a GIF
+        _frame_size: a tuple for the dimensions, in pixels, of the written
+        frames
+        _frame_duration: an int for the milliseconds each GIF frame is shown
+        _frames: an int for the number of frames captured
+        _queue: a queue.Queue of frames waiting to be written
+        _error: the exception raised by the writer thread, or None
+        _closing: a boolean for whether the writer has taken the None that
+        close puts on the queue
+        _thread: the background writer thread
+    """
+
+    def __init__(self, board_instance, path, scale_factor=20, downsample=1,
+                 frame_duration=50, max_queued=64):
+        """
+        Initialize the recorder and start the background writer
+
+        Args:
+            board_instance: a gameboard
+            path: a string path ending in .gif to write an animated GIF, or
+            a path to a directory to write numbered PNG files into
+            scale_factor: an int for the side length, in pixels, of a square
+            downsample: an int factor the frames are shrunk by before they
+            are written
+            frame_duration: an int for the milliseconds each GIF frame is
+            shown
+            max_queued: an int for the most frames waiting to be written
+        Returns:
+            No return value
+        """
+        side = board_instance.size * scale_factor
+        super().__init__(board_instance, scale_factor,
+                         screen=pygame.Surface((side, side)))
+
+        self._path = path
+        self._gif = str(path).lower().endswith(".gif")
+        if self._gif and Image is None:
+            raise ImportError("Recording a GIF needs Pillow, which can be "
+                              "installed using pip install pillow")
+        directory = os.path.dirname(path) if self._gif else path
+        os.makedirs(directory or ".", exist_ok=True)
+        self._frame_size = (max(1, side // downsample),
+                            max(1, side // downsample))
+        self._frame_duration = frame_duration
+        self._frames = 0
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._error = None
+        self._closing = False
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    @property
+    def path(self):
+        """
+        Return the path frames are written to, which is a private attribute
+        """
+        return self._path
+
+    @property
+    def frames(self):
+        """
+        Return the number of frames captured so far
+        """
+        return self._frames
+
+    def draw(self):
+        """
+        Draw the current state of the board and queue it as the next frame
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+        self._render()
+        frame = self.screen
+        if frame.get_size() != self._frame_size:
+            frame = pygame.transform.scale(frame, self._frame_size)
+        self._queue.put(pygame.image.tobytes(frame, "RGB"))
+        self._frames += 1
+
+    def draw_gameover(self):
+        """
+        Do nothing, since only the board is recorded
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+
+    def start_text(self):
+        """
+        Do nothing, since only the board is recorded
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+
+    def close(self):
+        """
+        Wait for every queued frame to be written and finish the file
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write_loop(self):
+        """
+        Write frames as they arrive until the recorder is closed
+        """
+        try:
+            if self._gif:
+                self._write_gif()
+            else:
+                self._write_pngs()
+        except Exception as error:  # pylint: disable=broad-except
+            self._error = error
+            # Keep draining so draw never blocks on a dead writer, unless
+            # close has already been seen and nothing else will arrive
+            if not self._closing:
+                while self._queue.get() is not None:
+                    pass
+
+    def _write_pngs(self):
+        """
+        Write each frame to its own numbered PNG file
+        """
+        index = 0
+        while True:
+            data = self._queue.get()
+            if data is None:
+                self._closing = True
+                return
+            frame = pygame.image.frombytes(data, self._frame_size, "RGB")
+            pygame.image.save(frame, os.path.join(self._path,
+                                                  f"frame_{index:05d}.png"))
+            index += 1
+
+    def _write_gif(self):
+        """
+        Append each frame to an animated GIF, writing the header with the
+        first frame and the trailer when the recorder is closed
+        """
+        palette = _gif_palette(self._eye_color)
+        temp_path = f"{self._path}.tmp"
+        with open(temp_path, "wb") as file:
+            first = True
+            while True:
+                data = self._queue.get()
+                if data is None:
+                    self._closing = True
+                    break
+                frame = Image.frombytes("RGB", self._frame_size, data)
+                frame = frame.quantize(palette=palette,
+                                       dither=Image.Dither.NONE)
+                if first:
+                    header, _ = GifImagePlugin.getheader(
+                        frame, info={"loop": 0,
+                                     "duration": self._frame_duration})
+                    file.write(b"".join(header))
+                    first = False
+                file.write(b"".join(GifImagePlugin.getdata(
+                    frame, duration=self._frame_duration)))
+            file.write(b";")
+        os.replace(temp_path, self._path)
+
+
+def _gif_palette(eye_color):
+    """
+    Return a palette image with every cell color, the eye color and evenly
+    spaced shades of the snake, which fits the 256 colors a GIF allows
+    """
+    colors = [cell.color for cell in CELL_OBJECTS] + [eye_color]
+    shade_count = 256 - len(colors)
+    snake_color = CELL_OBJECTS[SNAKE].color
+    top_shade = TileAtlas.shades - 1
+    for index in range(shade_count):
+        shade = round(index * top_shade / (shade_count - 1))
+        colors.append(tuple(round(shade * value / top_shade)
+                            for value in snake_color))
+    palette = Image.new("P", (1, 1))
+    palette.putpalette([value for color in colors for value in color])
+    return palette
+
+
+def record_games(path_to_agent, path, episodes=1, side=20, scale_factor=20,
+                 downsample=1, every=1, seed=None, max_steps=None):
+    """
+    Record games of a saved agent without a display window
+
+    The agent keeps learning during the games as it would while training,
+    but the saved agent is not changed.
+
+    Args:
+        path_to_agent: a string path to the agent csv or binary agent
+        path: a string path to a GIF or a directory of PNG files
+        episodes: an int for the number of games to record
+        side: an int for the side length of the board
+        scale_factor: an int for the side length, in pixels, of a square
+        downsample: an int factor the frames are shrunk by
+        every: an int for the number of steps per recorded frame
+        seed: an optional int seed for the first game, with each later game
+        seeded one higher
+        max_steps: an optional int for the most steps a game may take
+    Returns:
+        frames: an int for the number of frames recorded
+    """
+    board = GameBoard(side, seed)
+    controller = RLPlayer(board, None, None,
+                          table=QTable.read(path_to_agent))
+    with RecordingView(board, path, scale_factor, downsample) as recorder:
+        scheduler = RenderScheduler(recorder, render_every=every)
+        for episode in range(episodes):
+            if episode > 0:
+                board.reset(None if seed is None else seed + episode)
+                controller.new_game(board)
+                recorder.invalidate()
+            scheduler.start_episode()
+            recorder.draw()
+            steps = 0
+            while not board.end_condition and \
+                    (max_steps is None or steps < max_steps):
+                controller.act()
+                board.check_next_square()
+                scheduler.step()
+                steps += 1
+    return recorder.frames
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("output",
+                        help="path to a .gif file or a directory for PNGs")
+    parser.add_argument("--agent", default="snake1.csv",
+                        help="path to the agent csv")
+    parser.add_argument("--episodes", type=int, default=1,
+                        help="number of games to record")
+    parser.add_argument("--side", type=int, default=20,
+                        help="side length of the board")
+    parser.add_argument("--scale", type=int, default=20,
+                        help="pixels per square")
+    parser.add_argument("--downsample", type=int, default=1,
+                        help="factor to shrink the frames by")
+    parser.add_argument("--every", type=int, default=1,
+                        help="steps per recorded frame")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed of the first game")
+    parser.add_argument("--max-steps", type=int, default=None,
+                        help="most steps a game may take")
+    args = parser.parse_args()
+
+    frame_count = record_games(args.agent, args.output, args.episodes,
+                               args.side, args.scale, args.downsample,
+                               args.every, args.seed, args.max_steps)
+    print(f"Recorded {frame_count} frames to {args.output}")
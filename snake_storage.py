@@ -0,0 +1,355 @@
+"""
+This module contains the storage helpers used while training agents. It
+includes the GameRecordWriter class, which appends finished games to the game
+record csv, and the CheckpointManager class, which saves agents from a
+background thread.
+"""
+
+import os
+import threading
+import time
+import pandas as pd
+from snake_qtable import QTable
+
+
+class GameRecordWriter:
+    """
+    Append-only writer for the game record csv that numbers games
+    sequentially and writes buffered games in batches, so recording a game
+    never rewrites the games before it.
+
+    Attributes:
+        _path: a string path to the game record csv
+        _flush_every: an int for the number of buffered games that triggers a
+        write
+        _buffer: a list of csv lines waiting to be written
+        _next_game: an int for the number of the next recorded game
+    """
+    columns = ["Game number", "Length", "Steps", "Time", "Seed"]
+
+    def __init__(self, path, flush_every=50):
+        """
+        Open the game record at path, continuing the game numbers of an
+        existing record
+
+        Args:
+            path: a string path to the game record csv
+            flush_every: an int for the number of games to buffer before
+            writing them
+        Returns:
+            No return value
+        """
+        self._path = path
+        self._flush_every = flush_every
+        self._buffer = []
+        self._next_game = 1
+
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(",".join(self.columns) + "\n")
+        elif self._read_header() != self.columns:
+            self._upgrade_record()
+        else:
+            last_game = self._read_last_line().split(",")[0]
+            if last_game.isdigit():
+                self._next_game = int(last_game) + 1
+
+    @property
+    def path(self):
+        """
+        Return the path to the game record csv, which is a private attribute
+        """
+        return self._path
+
+    @property
+    def next_game(self):
+        """
+        Return the number the next recorded game will get
+        """
+        return self._next_game
+
+    def record(self, length, steps=None, seconds=None, seed=None):
+        """
+        Add a finished game to the record, writing the buffer if it is full
+
+        Args:
+            length: an int for the final snake length
+            steps: an optional int for the number of steps played
+            seconds: an optional float for the wall-clock time of the game
+            seed: an optional int seed the game was played with
+        Returns:
+            an int for the number of the recorded game
+        """
+        fields = [self._next_game, length, steps,
+                  None if seconds is None else f"{seconds:.6f}", seed]
+        self._buffer.append(
+            ",".join("" if field is None else str(field) for field in fields))
+        self._next_game += 1
+        if len(self._buffer) >= self._flush_every:
+            self.flush()
+        return self._next_game - 1
+
+    def flush(self):
+        """
+        Append every buffered game to the game record csv
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+        if not self._buffer:
+            return
+        with open(self._path, "a", encoding="utf-8") as file:
+            file.write("\n".join(self._buffer) + "\n")
+        self._buffer = []
+
+    def close(self):
+        """
+        Write any buffered games
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+        self.flush()
+
+    def to_dataframe(self):
+        """
+        Return every recorded game, including buffered ones, as a DataFrame
+
+        Args:
+            None
+        Returns:
+            a pandas DataFrame with the GameRecordWriter.columns as columns
+        """
+        self.flush()
+        return pd.read_csv(self._path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _read_header(self):
+        """
+        Return the column names on the first line of the game record
+        """
+        with open(self._path, encoding="utf-8") as file:
+            return file.readline().strip().split(",")
+
+    def _read_last_line(self):
+        """
+        Return the last line of the game record without reading the rest
+        """
+        with open(self._path, "rb") as file:
+            file.seek(0, os.SEEK_END)
+            position = file.tell()
+            block = b""
+            while position > 0 and block.rstrip(b"\n").count(b"\n") < 1:
+                step = min(1024, position)
+                position -= step
+                file.seek(position)
+                block = file.read(step) + block
+        return block.rstrip(b"\n").split(b"\n")[-1].decode("utf-8")
+
+    def _upgrade_record(self):
+        """
+        Rewrite a game record from before the Steps, Time and Seed columns,
+        numbering its games sequentially. This only happens once per file.
+        """
+        old_record = pd.read_csv(self._path)
+        record = pd.DataFrame(columns=self.columns)
+        record["Length"] = old_record["Length"]
+        record["Game number"] = range(1, len(old_record) + 1)
+        record.to_csv(self._path, index=False)
+        self._next_game = len(old_record) + 1
+
+
+def write_atomic(table, path):
+    """
+    Write a QTable to path so that path always holds either the old or the
+    new agent, even if the process dies while writing
+
+    The table is written to a temp file next to path, flushed to disk and
+    then renamed over path.
+
+    Args:
+        table: the QTable to write
+        path: a string path to the agent csv or binary agent
+    Returns:
+        No return value
+    """
+    root, extension = os.path.splitext(str(path))
+    temp_path = f"{root}.tmp{extension}"
+    table.write(temp_path)
+    with open(temp_path, "rb+") as file:
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+class CheckpointManager:
+    """
+    Saves snapshots of a QTable every few episodes or seconds. The writes
+    happen on a background thread, so training does not wait on the disk.
+    If a new snapshot is taken while one is still being written, only the
+    newest waiting snapshot is written next. A failed write does not stop
+    the writer, and its error is raised from wait and close.
+
+    Attributes:
+        _table: the QTable to save
+        _path: a string path to the agent csv or binary agent
+        _every_episodes: an optional int for the episodes between checkpoints
+        _every_seconds: an optional float for the seconds between checkpoints
+        _episodes: an int for the episodes since the last checkpoint
+        _last_time: a float for the time of the last checkpoint
+        _pending: the newest snapshot waiting to be written, or None
+        _writing: a boolean for whether a snapshot is being written
+        _condition: a threading.Condition guarding _pending, _writing and
+        _closed
+        _closed: a boolean for whether close has been called
+        _error: the exception of the latest failed write, or None
+        _thread: the background writer thread
+    """
+
+    def __init__(self, table, path, every_episodes=1, every_seconds=None):
+        """
+        Start the background writer for a table
+
+        Args:
+            table: the QTable to save
+            path: a string path to the agent csv or binary agent
+            every_episodes: an optional int for the episodes between
+            checkpoints, or None to only checkpoint by time
+            every_seconds: an optional float for the seconds between
+            checkpoints, or None to only checkpoint by episodes
+        Returns:
+            No return value
+        """
+        self._table = table
+        self._path = path
+        self._every_episodes = every_episodes
+        self._every_seconds = every_seconds
+        self._episodes = 0
+        self._last_time = time.monotonic()
+        self._pending = None
+        self._writing = False
+        self._closed = False
+        self._error = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    @property
+    def path(self):
+        """
+        Return the path checkpoints are written to, which is a private
+        attribute
+        """
+        return self._path
+
+    def episode_done(self, count=1):
+        """
+        Count finished episodes and take a checkpoint if one is due
+
+        Args:
+            count: an int for the number of episodes that finished
+        Returns:
+            True if a checkpoint was taken, False otherwise
+        """
+        self._episodes += count
+        due_by_episodes = self._every_episodes is not None and \
+            self._episodes >= self._every_episodes
+        due_by_time = self._every_seconds is not None and \
+            time.monotonic() - self._last_time >= self._every_seconds
+        if due_by_episodes or due_by_time:
+            self.checkpoint()
+            return True
+        return False
+
+    def checkpoint(self):
+        """
+        Snapshot the table and hand the snapshot to the background writer
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+        snapshot = QTable(self._table.q_sums.copy(), self._table.counts.copy())
+        self._episodes = 0
+        self._last_time = time.monotonic()
+        with self._condition:
+            self._pending = snapshot
+            self._condition.notify()
+
+    def wait(self):
+        """
+        Block until every snapshot taken so far has been written
+
+        Args:
+            None
+        Returns:
+            No return value
+        Raises:
+            OSError: or any other exception of a failed background write
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._pending is None and not self._writing)
+        self._raise_error()
+
+    def close(self):
+        """
+        Take a final checkpoint, wait for it to be written and stop the
+        background writer
+
+        Args:
+            None
+        Returns:
+            No return value
+        Raises:
+            OSError: or any other exception of a failed background write
+        """
+        if self._closed:
+            return
+        self.checkpoint()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self):
+        """
+        Raise the error of the latest failed write once, if there is one
+        """
+        with self._condition:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _write_loop(self):
+        """
+        Write snapshots as they arrive until the manager is closed
+        """
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return
+                snapshot, self._pending = self._pending, None
+                self._writing = True
+            error = None
+            try:
+                write_atomic(snapshot, self._path)
+            except Exception as write_error:  # pylint: disable=broad-except
+                error = write_error
+            with self._condition:
+                if error is not None:
+                    self._error = error
+                self._writing = False
+                self._condition.notify_all()
@@ -0,0 +1,346 @@
+"""
+This module trains RLPlayer agents. It includes the RLTrainer class, which
+keeps one agent loaded across many games, and a parallel trainer that plays
+games in a pool of worker processes and merges what they learned into one
+agent.
+
+RLPlayer learns from running sums of rewards and visit counts, which simply
+add up across independent games, so workers can learn from their own copy of
+the agent and send back the difference. Within a round a worker only sees its
+own updates, so its moves are chosen from a table that is missing the other
+workers' games of that round. The merged agent is therefore not the same as
+one trained on the games one after another, but batched like minibatch
+updates, with the table at most one round stale.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from snake_model import GameBoard
+from snake_controller import RLPlayer
+from snake_qtable import QTable
+from snake_storage import CheckpointManager
+
+
+def play_rl_game(board, controller, max_steps=None, deadline=None,
+                 on_step=None):
+    """
+    Play one game with an RLPlayer until it ends or runs out of steps or time
+
+    Args:
+        board: the GameBoard the controller plays on
+        controller: an RLPlayer for the board
+        max_steps: an optional int for the most steps the game may take
+        deadline: an optional time.perf_counter value to stop the game at
+        on_step: an optional function called after every step, e.g. to draw
+        the board
+    Returns:
+        steps: an int for the number of steps played
+    """
+    steps = 0
+    while not board.end_condition and (max_steps is None or steps < max_steps):
+        controller.act()
+        board.check_next_square()
+        if on_step is not None:
+            on_step()
+        steps += 1
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+    return steps
+
+
+class RLTrainer:
+    """
+    Long-lived trainer that loads an agent once and plays game after game
+    with it, resetting only the episode state between games.
+
+    Attributes:
+        _side: an int for the side length of the boards
+        _seed: an optional int seed of the first game, or None
+        _table: the QTable holding the agent
+        _checkpoints: the CheckpointManager saving the agent
+        _board: the GameBoard of the current game
+        _controller: the RLPlayer playing on _board
+        _view: an optional view drawing _board, or None
+    """
+
+    def __init__(self, path_to_agent, path_to_record, side=20, e=0,
+                 checkpoint_every=50, checkpoint_seconds=None, seed=None):
+        """
+        Load the agent, or create it if path_to_agent does not exist, and set
+        up the first game
+
+        Args:
+            path_to_agent: a string path to the agent csv or binary agent
+            path_to_record: a string path to the game record csv
+            side: an int for the side length of the boards
+            e: a float for the probability of a random move
+            checkpoint_every: an int for the games between saves of the
+            agent, or None
+            checkpoint_seconds: a float for the seconds between saves of the
+            agent, or None
+            seed: an optional int seed for the first game, with each later
+            game seeded one higher
+        Returns:
+            No return value
+        """
+        self._side = side
+        self._seed = seed
+        if os.path.exists(path_to_agent):
+            self._table = QTable.read(path_to_agent)
+        else:
+            self._table = QTable.new(RLPlayer.initial_reward)
+        self._checkpoints = CheckpointManager(self._table, path_to_agent,
+                                              checkpoint_every,
+                                              checkpoint_seconds)
+        self._board = GameBoard(side, seed)
+        self._controller = RLPlayer(self._board, path_to_agent,
+                                    path_to_record, e=e, table=self._table,
+                                    checkpoints=self._checkpoints)
+        self._view = None
+        self._played = 0
+
+    @property
+    def board(self):
+        """
+        Return the GameBoard of the current game
+        """
+        return self._board
+
+    @property
+    def controller(self):
+        """
+        Return the RLPlayer, which is a private attribute
+        """
+        return self._controller
+
+    @property
+    def table(self):
+        """
+        Return the QTable holding the agent
+        """
+        return self._table
+
+    @property
+    def played(self):
+        """
+        Return the number of games finished by this trainer
+        """
+        return self._played
+
+    def attach_view(self, view):
+        """
+        Draw every game on view
+
+        Args:
+            view: a SnakeView, or None to stop drawing
+        Returns:
+            No return value
+        """
+        self._view = view
+        if view is not None:
+            view.board = self._board
+
+    def new_game(self):
+        """
+        Start a new game with the same agent on the same board
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+        seed = None
+        if self._seed is not None:
+            seed = self._seed + self._played
+        self._board.reset(seed)
+        self._controller.new_game(self._board)
+
+    def play_episode(self, max_steps=None, on_step=None, deadline=None):
+        """
+        Play the current game to the end, record it and start a new one
+
+        Args:
+            max_steps: an optional int for the most steps the game may take
+            on_step: an optional function called after every step
+            deadline: an optional time.perf_counter value to stop the game at
+        Returns:
+            length: an int for the final snake length
+            steps: an int for the number of steps played
+        """
+        board = self._board
+        steps = play_rl_game(board, self._controller, max_steps, deadline,
+                             on_step)
+        self._controller.export_at_endgame()
+        self._played += 1
+        length = board.snake_length
+        self.new_game()
+        return length, steps
+
+    def train(self, episodes, time_budget=None, max_steps=None,
+              scheduler=None):
+        """
+        Play games until the episode or time budget runs out
+
+        Args:
+            episodes: an int for the maximum number of games to play
+            time_budget: a float for the maximum number of seconds to train,
+            or None for no time limit
+            max_steps: an optional int for the most steps a game may take
+            scheduler: an optional RenderScheduler drawing the attached view
+        Returns:
+            played: an int for the number of games played
+        """
+        deadline = None
+        if time_budget is not None:
+            deadline = time.perf_counter() + time_budget
+        played = 0
+        on_step = None if scheduler is None else scheduler.step
+        while played < episodes:
+            if scheduler is not None:
+                scheduler.start_episode()
+            self.play_episode(max_steps, on_step, deadline)
+            played += 1
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+        return played
+
+    def close(self):
+        """
+        Wait for the final save of the agent and write any buffered games
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+        self._controller.close()
+
+
+def collect_deltas(q_sums, counts, games, side, seed, max_steps=None):
+    """
+    Play games on a copy of an agent and return what the copy learned
+
+    This runs in the worker processes of train_parallel.
+
+    Args:
+        q_sums: an array of reward sums of the master agent
+        counts: an array of visit counts of the master agent
+        games: an int for the number of games to play
+        side: an int for the side length of the boards
+        seed: an int seed for the first game, with game i seeded seed + i
+        max_steps: an optional int for the most steps a game may take
+    Returns:
+        q_delta: an array of the rewards added to q_sums
+        count_delta: an array of the visits added to counts
+        records: a list of (length, steps, seconds, seed) tuples, one per
+        game
+    """
+    table = QTable(q_sums.copy(), counts.copy(), seed)
+    records = []
+    for game in range(games):
+        game_seed = seed + game
+        # The seed fixes the apples and, since exploration uses np.random,
+        # the random moves of the game
+        np.random.seed(game_seed)
+        start = time.perf_counter()
+        board = GameBoard(side, game_seed)
+        controller = RLPlayer(board, None, None, table=table)
+        steps = play_rl_game(board, controller, max_steps)
+        records.append((board.snake_length, steps,
+                        time.perf_counter() - start, game_seed))
+    return table.q_sums - q_sums, table.counts - counts, records
+
+
+def train_parallel(episodes, path_to_agent, path_to_record, workers=None,
+                   games_per_sync=10, side=20, seed=0, max_steps=None,
+                   checkpoint_every=None, checkpoint_seconds=60):
+    """
+    Train an agent with games played in parallel worker processes
+
+    Every round, each worker plays games_per_sync games on its own copy of
+    the agent. Their reward sums and visit counts are then added into the
+    master agent, which the workers start from on the next round.
+
+    Args:
+        episodes: an int for the total number of games to play
+        path_to_agent: a string path to the agent csv or binary agent,
+        created if missing
+        path_to_record: a string path to the game record csv, or None to not
+        record games
+        workers: an optional int for the number of worker processes, the
+        number of cpus by default
+        games_per_sync: an int for the games each worker plays per round
+        side: an int for the side length of the boards
+        seed: an int seed for the first game, with every game seeded by
+        its own number so each recorded seed is unique
+        max_steps: an optional int for the most steps a game may take
+        checkpoint_every: an optional int for the games between saves of
+        the agent
+        checkpoint_seconds: an optional float for the seconds between saves
+        of the agent
+    Returns:
+        lengths: a list of the final snake length of each game
+    """
+    workers = workers or os.cpu_count()
+    controller = RLPlayer(GameBoard(side), path_to_agent, path_to_record,
+                          new_agent=not os.path.exists(path_to_agent))
+    master = controller.table
+    checkpoints = CheckpointManager(master, path_to_agent, checkpoint_every,
+                                    checkpoint_seconds)
+    lengths = []
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            while len(lengths) < episodes:
+                remaining = episodes - len(lengths)
+                games = [min(games_per_sync,
+                             remaining - worker * games_per_sync)
+                         for worker in range(workers)]
+                games = [count for count in games if count > 0]
+                seeds = [seed + len(lengths) + worker * games_per_sync
+                         for worker in range(len(games))]
+
+                results = pool.map(collect_deltas,
+                                   [master.q_sums] * len(games),
+                                   [master.counts] * len(games), games,
+                                   [side] * len(games), seeds,
+                                   [max_steps] * len(games))
+                for q_delta, count_delta, records in results:
+                    master.q_sums[:] += q_delta
+                    master.counts[:] += count_delta
+                    for length, steps, seconds, game_seed in records:
+                        if controller.game_record is not None:
+                            controller.game_record.record(length, steps,
+                                                          seconds, game_seed)
+                        lengths.append(length)
+                checkpoints.episode_done(sum(games))
+    finally:
+        try:
+            checkpoints.close()
+        finally:
+            if controller.game_record is not None:
+                controller.game_record.close()
+    return lengths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--episodes", type=int, default=500,
+                        help="total number of games to play")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes")
+    parser.add_argument("--games-per-sync", type=int, default=10,
+                        help="games each worker plays between merges")
+    parser.add_argument("--agent", default="snake1.csv",
+                        help="path to the agent csv")
+    parser.add_argument("--record", default="snake1_record.csv",
+                        help="path to the game record csv")
+    args = parser.parse_args()
+
+    final_lengths = train_parallel(args.episodes, args.agent, args.record,
+                                   args.workers, args.games_per_sync)
+    print(f"Played {len(final_lengths)} games, "
+          f"mean length {np.mean(final_lengths):.2f}")
@@ -0,0 +1,346 @@
+"""
+This file outlines the VecGameBoard class, a batched counterpart to GameBoard
+that holds many snake games as stacked NumPy arrays and advances all of them
+in one vectorized call.
+"""
+
+import math
+import numpy as np
+from snake_model import BLANK, BORDER, SNAKE, APPLE, CELL_OBJECTS, \
+    DIRECTIONS, FRAME_ROTATIONS
+
+
+class VecGameBoard:
+    """
+    Batched snake game representation.
+
+    Every game follows the same rules as GameBoard. A game that ends is
+    automatically reset, so every step advances all games at once.
+
+    Attributes:
+    _num_games: An integer number of games held by the board.
+    _size: An integer for side length of each board in squares.
+    _rng: NumPy random Generator used to spawn apples.
+    _grid: int8 array of shape (num_games, size, size) with the cell code of
+           every square.
+    _body: int32 array of the same shape holding the number of steps each
+           Snake square stays on the board. The head holds the snake length
+           and the end of the tail holds 1.
+    _heads: int array of shape (num_games, 2) for the snake head positions.
+    _directions: int array of shape (num_games, 2) for the current
+                 directions of motion referring to _grid indices.
+    _apples: int array of shape (num_games, 2) for the apple positions.
+    _lengths: int array of shape (num_games,) for the snake lengths.
+    _end_conditions: Boolean array of shape (num_games,) marking the games
+                     that ended on the last step.
+    _final_lengths: int array of shape (num_games,) with the snake length each
+                    game ended with on the last step, or 0.
+    """
+    directions = np.array(DIRECTIONS)
+
+    # Direction code of each direction, indexed by 3 * (row + 1) + col + 1
+    direction_lookup = np.full(9, -1)
+    direction_lookup[3 * (directions[:, 0] + 1) + directions[:, 1] + 1] = \
+        np.arange(len(DIRECTIONS))
+
+    frame_rotations = np.array(FRAME_ROTATIONS)
+
+    rewards = np.array([obj.reward for obj in CELL_OBJECTS])
+
+    def __init__(self, num_games, side, seed=None):
+        """
+        Initializes num_games boards with the same layout as GameBoard.
+
+        Args:
+            num_games: An integer number of games to run side by side.
+            side: An integer length of each board. Includes borders.
+            seed: Optional seed for the random apple placement.
+        """
+        self._num_games = num_games
+        self._size = side
+        self._rng = np.random.default_rng(seed)
+
+        self._template = np.full((side, side), BLANK, dtype=np.int8)
+        self._template[0, :] = BORDER
+        self._template[-1, :] = BORDER
+        self._template[:, 0] = BORDER
+        self._template[:, -1] = BORDER
+        self._start = [math.ceil(side / 2), math.ceil(side / 2)]
+
+        self._grid = np.empty((num_games, side, side), dtype=np.int8)
+        self._body = np.zeros((num_games, side, side), dtype=np.int32)
+        self._heads = np.zeros((num_games, 2), dtype=np.int64)
+        self._directions = np.zeros((num_games, 2), dtype=np.int64)
+        self._apples = np.zeros((num_games, 2), dtype=np.int64)
+        self._lengths = np.zeros(num_games, dtype=np.int64)
+        self._end_conditions = np.zeros(num_games, dtype=bool)
+        self._final_lengths = np.zeros(num_games, dtype=np.int64)
+
+        self.reset_games(np.arange(num_games))
+
+    @property
+    def num_games(self):
+        """
+        Return integer number of games.
+        """
+        return self._num_games
+
+    @property
+    def size(self):
+        """
+        Return integer _size of board side length.
+        """
+        return self._size
+
+    @property
+    def grid(self):
+        """
+        Return int8 array of cell codes with shape (num_games, size, size).
+        """
+        return self._grid
+
+    @property
+    def heads(self):
+        """
+        Return array of snake head positions with shape (num_games, 2).
+        """
+        return self._heads
+
+    @property
+    def direction(self):
+        """
+        Return array of current snake directions with shape (num_games, 2).
+        """
+        return self._directions
+
+    @property
+    def apple(self):
+        """
+        Return array of apple positions with shape (num_games, 2).
+        """
+        return self._apples
+
+    @property
+    def snake_length(self):
+        """
+        Return integer array of snake lengths.
+        """
+        return self._lengths
+
+    @property
+    def end_condition(self):
+        """
+        Return boolean array of the games that ended on the last step.
+        """
+        return self._end_conditions
+
+    @property
+    def final_lengths(self):
+        """
+        Return integer array of the lengths the games ended with on the last
+        step, with 0 for games that are still running.
+        """
+        return self._final_lengths
+
+    @property
+    def direction_codes(self):
+        """
+        Return integer array of the codes in DIRECTIONS of the directions.
+        """
+        return self.direction_lookup[3 * (self._directions[:, 0] + 1) +
+                                     self._directions[:, 1] + 1]
+
+    @property
+    def tails(self):
+        """
+        Return array of snake tail positions with shape (num_games, 2).
+        """
+        flat_index = np.argmax(
+            (self._body == 1).reshape(self._num_games, -1), axis=1)
+        return np.stack(np.divmod(flat_index, self._size), axis=1)
+
+    @property
+    def surrounding_walls(self):
+        """
+        Return boolean array of shape (num_games, 3) marking a Border or
+        Snake square to the left, straight ahead and right of each head, as
+        GameBoard.surrounding_walls does.
+        """
+        games = np.arange(self._num_games)
+        codes = self.direction_codes
+        walls = np.empty((self._num_games, 3), dtype=bool)
+        for column, turn in enumerate((1, 0, -1)):
+            squares = self._heads + self.directions[(codes + turn) % 4]
+            cells = self._grid[games, squares[:, 0], squares[:, 1]]
+            walls[:, column] = (cells == BORDER) | (cells == SNAKE)
+        return walls
+
+    @property
+    def relative_apple(self):
+        """
+        Return integer array of shape (num_games, 2) with the direction of
+        each apple in the snake's frame of reference.
+        """
+        return self.vec2snakeframe(self._apples - self._heads)
+
+    @property
+    def relative_tail(self):
+        """
+        Return integer array of shape (num_games, 2) with the direction of
+        each tail in the snake's frame of reference.
+        """
+        return self.vec2snakeframe(self.tails - self._heads)
+
+    @property
+    def markov_state(self):
+        """
+        Return the surrounding_empty, surrounding_to_apple and
+        surrounding_apple boolean arrays of shape (num_games, 4), which hold
+        GameBoard.markov_state of every game row by row.
+        """
+        games = np.arange(self._num_games)[:, None]
+        squares = self._heads[:, None, :] + self.directions[None, :, :]
+        cells = self._grid[games, squares[:, :, 0], squares[:, :, 1]]
+        empty = (cells != BORDER) & (cells != SNAKE)
+        apples = self._apples[:, None, :]
+        to_apple = ((self._heads[:, None, :] - apples) ** 2).sum(axis=2) > \
+            ((squares - apples) ** 2).sum(axis=2)
+        return empty, to_apple, cells == APPLE
+
+    @property
+    def rl_state(self):
+        """
+        Return the surrounding_walls, relative_apple and relative_tail arrays,
+        which hold GameBoard.rl_state of every game row by row.
+        """
+        return self.surrounding_walls, self.relative_apple, self.relative_tail
+
+    def vec2snakeframe(self, vecs):
+        """
+        Returns the signs of each row of vecs rotated into the frame of
+        reference of the snake of the same game.
+
+        Args:
+            vecs: Integer array of shape (num_games, 2) in (delta row,
+                  delta col) format.
+        """
+        rotations = self.frame_rotations[self.direction_codes]
+        return np.sign(np.einsum("gij,gj->gi", rotations, vecs))
+
+    def toward_apple(self):
+        """
+        Returns boolean array marking the games whose next square is closer
+        to the apple than the head, as GameBoard.toward_apple does.
+        """
+        next_squares = self._heads + self._directions
+        return ((self._heads - self._apples) ** 2).sum(axis=1) > \
+            ((next_squares - self._apples) ** 2).sum(axis=1)
+
+    def turn(self, turns):
+        """
+        Turns every snake relative to its current direction.
+
+        Args:
+            turns: An integer array with 1 to turn left, 0 to go straight, or
+                   -1 to turn right, for each game.
+        """
+        self._directions[:] = self.directions[
+            (self.direction_codes + turns) % 4]
+
+    def change_direction(self, directions):
+        """
+        Switches the current direction of every game.
+
+        Args:
+            directions: An array of shape (num_games, 2) where each row is one
+                        of the following: [1,0], [-1,0], [0,1], or [0,-1].
+        """
+        self._directions[:] = directions
+
+    def reset_games(self, games):
+        """
+        Restores the given games to the initial GameBoard layout.
+
+        Args:
+            games: An integer array of game indices to reset.
+        """
+        if len(games) == 0:
+            return
+        self._grid[games] = self._template
+        self._body[games] = 0
+        self._heads[games] = self._start
+        self._directions[games] = [1, 0]
+        self._lengths[games] = 1
+        self._grid[games, self._start[0], self._start[1]] = SNAKE
+        self._body[games, self._start[0], self._start[1]] = 1
+        self.spawn_apples(games)
+
+    def spawn_apples(self, games):
+        """
+        Turns a random Blank square of each given game into an Apple.
+
+        Returns a boolean array marking the games that had no Blank square
+        left, which means the snake filled the board.
+
+        Args:
+            games: An integer array of game indices that need a new apple.
+        """
+        free = (self._grid[games] == BLANK).reshape(len(games), -1)
+        scores = np.where(free, self._rng.random(free.shape), -1.0)
+        flat_index = np.argmax(scores, axis=1)
+        full = ~free[np.arange(len(games)), flat_index]
+
+        rows, cols = np.divmod(flat_index, self._size)
+        placed = games[~full]
+        self._apples[placed, 0] = rows[~full]
+        self._apples[placed, 1] = cols[~full]
+        self._grid[placed, rows[~full], cols[~full]] = APPLE
+        return full
+
+    def check_next_square(self, auto_reset=True):
+        """
+        Moves every snake in its direction and interacts with the next square.
+
+        Each game maintains velocity, increases length, or ends exactly as
+        GameBoard.check_next_square would. Games that end are reset unless
+        auto_reset is False.
+
+        Args:
+            auto_reset: Boolean for whether ended games restart immediately.
+        Returns:
+            rewards: Float array with the reward of the square each snake
+                     moved into.
+            dones: Boolean array marking the games that ended on this step.
+        """
+        games = np.arange(self._num_games)
+        next_squares = self._heads + self._directions
+        codes = self._grid[games, next_squares[:, 0], next_squares[:, 1]]
+        rewards = self.rewards[codes]
+
+        dead = (codes == BORDER) | (codes == SNAKE)
+        eat = codes == APPLE
+        move = ~dead
+
+        # Every square of a snake that does not grow moves one step closer to
+        # the end of the tail, and the old end of the tail is cleared.
+        shrink = (move & ~eat)[:, None, None] & (self._body > 0)
+        self._body[shrink] -= 1
+        self._grid[shrink & (self._body == 0)] = BLANK
+
+        movers = games[move]
+        self._heads[movers] = next_squares[movers]
+        self._lengths[eat] += 1
+        self._grid[movers, next_squares[movers, 0],
+                   next_squares[movers, 1]] = SNAKE
+        self._body[movers, next_squares[movers, 0],
+                   next_squares[movers, 1]] = self._lengths[movers]
+
+        eaters = games[eat]
+        if len(eaters):
+            dead[eaters[self.spawn_apples(eaters)]] = True
+
+        self._end_conditions = dead
+        self._final_lengths = np.where(dead, self._lengths, 0)
+        if auto_reset:
+            self.reset_games(games[dead])
+        return rewards, dead
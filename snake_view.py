@@ -6,8 +6,57 @@ over screen.
 """
 
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from math import ceil, floor
+import sys
 import pygame
+from snake_model import CELL_CHARS, CELL_OBJECTS, DIRECTIONS, SNAKE
+
+
+@lru_cache(maxsize=None)
+def get_font(size):
+    """
+    Return the default pygame font in the given size, loading each size once
+
+    Args:
+        size: an int for the font size
+    Returns:
+        a pygame Font
+    """
+    return pygame.font.SysFont(None, size)
+
+
+@lru_cache(maxsize=64)
+def render_text(text, size, color):
+    """
+    Return a surface with the text rendered in the default font. Surfaces are
+    cached by text, size and color, so text with a new score is rendered
+    once and old scores eventually drop out of the cache.
+
+    Args:
+        text: a string to render
+        size: an int for the font size
+        color: a tuple for the RGB value of the text
+    Returns:
+        a pygame Surface
+    """
+    return get_font(size).render(text, True, color)
+
+
+def clear_caches():
+    """
+    Drop the cached fonts, text surfaces and tile atlases, which belong to
+    the pygame session they were made in and must not be used after
+    pygame.quit
+
+    Args:
+        None
+    Returns:
+        No return value
+    """
+    render_text.cache_clear()
+    get_font.cache_clear()
+    get_atlas.cache_clear()
 
 
 class SnakeView(ABC):
@@ -43,6 +92,19 @@ class SnakeView(ABC):
         """
         return self._board
 
+    @board.setter
+    def board(self, board_instance):
+        """
+        Switch the view to another gameboard, e.g. when a new game starts
+
+        Args:
+            board_instance: a gameboard, which is an instance of class
+            GameBoard
+        Returns:
+            No return value
+        """
+        self._board = board_instance
+
     @abstractmethod
     def draw(self):
         """
@@ -73,258 +135,253 @@ class TextView(SnakeView):
     Class for printing a text-based gameboard to the screen, which inherits
     from SnakeView
 
-    Attributes:
-        _board: an instance of GameBoard
-    """
-
-    def draw(self):
-        """
-        Print the gameboard to the screen using text-based visualization
-
-        Args:
-            None
-        Returns:
-            No return value
-        """
-        print(self.board)
-
-
-class PygameView(SnakeView):
-    """
-    Class for displaying the gameboard using a pygame screen, which inherits
-    from SnakeView
+    On a terminal, the board is printed once and every later frame only
+    rewrites the squares that changed, using ANSI cursor movement. Anywhere
+    else, such as a log file, the whole board is printed every frame.
 
     Attributes:
         _board: an instance of GameBoard
-        _scale_factor: an int representing side dimension, in pixels, of the
-        objects on the pygame screen
-        _screen_size: an tuple representing the dimensions of the pygame
-        screen, in pixels
-        _screen: a pygame surface
-        _buffer: an int controlling the color gradient of the snake
-        _eye_color: a tuple for the RGB value of the snake's eyes
-        _eye_size: an int representing the size of the snake's eyes
-        _padding: an int representing the dist. the snake's eyes are from the
-        edge of the head
+        _stream: the text stream the board is written to
+        _ansi: a boolean for whether changed squares are rewritten in place
+        _full_redraw: a boolean for whether the next frame must print the
+        whole board
+        _tracked_board: the gameboard whose changes the view is following
     """
 
-    def __init__(self, board_instance):
+    def __init__(self, board_instance, stream=None, ansi=None):
         """
-        Initialize the pygame view using the gameboard that will be visualized
-        and set up the pygame screen dimensions and snake colors
+        Initialize the text view
 
         Args:
             board_instance: a gameboard
+            stream: an optional text stream to write to, sys.stdout by
+            default
+            ansi: an optional boolean for whether to rewrite changed squares
+            in place, True by default when the stream is a terminal
         Returns:
             No return value
         """
         super().__init__(board_instance)
+        self._stream = sys.stdout if stream is None else stream
+        if ansi is None:
+            ansi = hasattr(self._stream, "isatty") and self._stream.isatty()
+        self._ansi = ansi
+        self._full_redraw = True
+        self._tracked_board = None
 
-        self._scale_factor = 45
-        self._screen_size = self.board.size * \
-            self._scale_factor, self.board.size * self._scale_factor
-        self._screen = pygame.display.set_mode(self._screen_size)
-
-        self._buffer = 20  # Higher buffer means lighter snake in general
-        self._eye_color = (200, 200, 0)
-        self._eye_size = .125
-        self._padding = .2
-
-    @property
-    def scale_factor(self):
+    def draw(self):
         """
-        Return the scale factor, which is a private attribute
+        Print the gameboard to the screen using text-based visualization
 
         Args:
             None
         Returns:
-            self._scale_factor: an int representing the scale factor
-        """
-        return self._scale_factor
-
-    @property
-    def screen(self):
+            No return value
         """
-        Return the screen surface, which is a private attribute
+        if not self._ansi:
+            self._stream.write(f"{self.board!r}\n")
+            self._stream.flush()
+            return
+
+        if self._tracked_board is not self.board:
+            self.board.track_changes()
+            self._tracked_board = self.board
+            self._full_redraw = True
+
+        changes = self.board.pop_changes()
+        if self._full_redraw:
+            # Clear the screen and print the board from the top left corner
+            text = f"\x1b[2J\x1b[H{self.board!r}"
+            self._full_redraw = False
+        else:
+            grid = self.board.grid
+            text = "".join(
+                f"\x1b[{row_index + 1};{col_index + 1}H"
+                f"{CELL_CHARS[grid[row_index, col_index]]}"
+                for row_index, col_index in set(changes))
+        size = self.board.size
+        self._stream.write(f"{text}\x1b[{size + 1};1H"
+                           f"Length: {self.board.snake_length}\x1b[K\n")
+        self._stream.flush()
+
+    def invalidate(self):
+        """
+        Make the next call to draw print the whole board
 
         Args:
             None
         Returns:
-            self._screen: the pygame screen
+            No return value
         """
-        return self._screen
+        self._full_redraw = True
 
-    @property
-    def buffer(self):
+    def draw_gameover(self):
         """
-        Return the value for buffer, which is a private attribute
+        Print the final length of the snake
 
         Args:
             None
         Returns:
-            self._buffer: an int controlling the color of the snake
+            No return value
         """
-        return self._buffer
+        self._stream.write(
+            f"GAME OVER - your final length was {self.board.snake_length}\n")
+        self._stream.flush()
+        self._full_redraw = True
 
-    @property
-    def eye_color(self):
+
+class TileAtlas:
+    """
+    Sprites for every square the pygame view draws, rendered once per scale
+    factor. The board cells and every shade of the snake share one surface,
+    and the eyes facing each direction share another surface with a
+    transparent background, so a frame is drawn by blitting areas of the two
+    surfaces instead of drawing rects.
+
+    Attributes:
+        _scale_factor: an int for the side length, in pixels, of a sprite
+        _tiles: a pygame surface with the cell sprites and the snake shades
+        _eyes: a pygame surface with the eyes for each direction
+        _cell_areas: a tuple with the area of _tiles for each cell code
+        _shade_areas: a tuple with the area of _tiles for each of the 256
+        shades of the snake, from darkest to lightest
+        _eye_areas: a tuple with the area of _eyes for each direction code
+    """
+    shades = 256
+    columns = 16
+
+    def __init__(self, scale_factor, eye_color, eye_size, padding):
         """
-        Return the tuple for eye color, which is a private attribute
+        Render the sprites
 
         Args:
-            None
+            scale_factor: an int for the side length, in pixels, of a sprite
+            eye_color: a tuple for the RGB value of the snake's eyes
+            eye_size: a float for the size of the eyes relative to a square
+            padding: a float for the distance of the eyes from the edge of
+            the head relative to a square
         Returns:
-            self._eye_color: a tuple for the RGB value for the snake's eyes
+            No return value
         """
-        return self._eye_color
+        self._scale_factor = scale_factor
+        snake_color = CELL_OBJECTS[SNAKE].color
+        colors = [cell.color for cell in CELL_OBJECTS]
+        colors += [tuple(round(shade * value / (self.shades - 1))
+                         for value in snake_color)
+                   for shade in range(self.shades)]
+
+        areas = [self._area(index) for index in range(len(colors))]
+        rows = ceil(len(colors) / self.columns)
+        self._tiles = pygame.Surface((self.columns * scale_factor,
+                                      rows * scale_factor))
+        for color, area in zip(colors, areas):
+            self._tiles.fill(color, area)
+        self._cell_areas = tuple(areas[:len(CELL_OBJECTS)])
+        self._shade_areas = tuple(areas[len(CELL_OBJECTS):])
+
+        # The eyes are drawn on a background of a color no eye has, which is
+        # then made transparent
+        background = (0, 0, 0) if eye_color != (0, 0, 0) else (255, 255, 255)
+        self._eyes = pygame.Surface((len(DIRECTIONS) * scale_factor,
+                                     scale_factor))
+        self._eyes.fill(background)
+        self._eyes.set_colorkey(background)
+        self._eye_areas = tuple(self._area(code, len(DIRECTIONS))
+                                for code in range(len(DIRECTIONS)))
+        for code, (direction_ver, direction_hor) in enumerate(DIRECTIONS):
+            offset = code * scale_factor
+            size = ceil(scale_factor * eye_size)
+            if direction_hor != 0:
+                x_ver = ceil((0.5 - eye_size + 0.125 * direction_hor) *
+                             scale_factor)
+                y_ver = ceil(padding * scale_factor)
+                eyes = [(x_ver, y_ver),
+                        (x_ver, y_ver + (1 - 3 * padding) * scale_factor)]
+            else:
+                x_ver = ceil(padding * scale_factor)
+                y_ver = ceil((.5 - eye_size + padding * direction_ver) *
+                             scale_factor)
+                eyes = [(x_ver, y_ver),
+                        (x_ver + (1 - 3 * padding) * scale_factor, y_ver)]
+            for x_eye, y_eye in eyes:
+                pygame.draw.rect(self._eyes, eye_color,
+                                 (x_eye + offset, y_eye, size, size))
+
+        if pygame.display.get_surface() is not None:
+            self._tiles = self._tiles.convert()
+            self._eyes = self._eyes.convert()
 
     @property
-    def eye_size(self):
+    def scale_factor(self):
         """
-        Return the value for eye size, which is a private attribute
-
-        Args:
-            None
-        Returns:
-            self._eye_size: an int representing the size of the snake's eyes
+        Return the scale factor, which is a private attribute
         """
-        return self._eye_size
+        return self._scale_factor
 
     @property
-    def padding(self):
+    def tiles(self):
         """
-        Return the value for padding, which is a private attribute
-
-        Args:
-            None
-        Returns:
-            self._padding: an int representing the distance the snake's eyes
-            are from the edge of the head
+        Return the surface with the cell sprites and the snake shades
         """
-        return self._padding
+        return self._tiles
 
-    def draw(self):
+    @property
+    def eyes(self):
         """
-        Draw the current state of the board to the screen and update the screen
-
-        Args:
-            None
-        Returns:
-            None
+        Return the surface with the eyes for each direction
         """
-        for row_index, row in enumerate(self.board.board_array):
-            for col_index, item in enumerate(row):
-                pygame.draw.rect(self.screen, item.color, pygame.Rect(
-                    col_index * self.scale_factor,
-                    row_index * self.scale_factor, self.scale_factor,
-                    self.scale_factor))
-
-        for index, square in enumerate(self.board.snake):
-            item = self.board.get_square(square)
-            color_factor = (index + self.buffer / 2) / \
-                (self.board.snake_length + self.buffer)
-            color = [item.color[0], item.color[1], item.color[2]]
-            color = [color_factor * value for value in color]
-            pygame.draw.rect(self.screen, color, pygame.Rect(
-                square[1] * self.scale_factor,
-                square[0] * self.scale_factor, self.scale_factor,
-                self.scale_factor))
-
-        head_row = self.board.snake[0][0]
-        head_col = self.board.snake[0][1]
-        direction_ver = self.board.direction[0]
-        direction_hor = self.board.direction[1]
-        if direction_hor != 0:
-            x_ver = ceil((head_col + 0.5 - self.eye_size + 0.125 *
-                          direction_hor) * self.scale_factor)
-            y_ver = ceil((head_row + self.padding) * self.scale_factor)
-            pygame.draw.rect(self.screen, self.eye_color,
-                             (x_ver,
-                              y_ver,
-                              ceil(self.scale_factor * self.eye_size),
-                                 ceil(self.scale_factor * self.eye_size)))
-            pygame.draw.rect(self.screen, self.eye_color,
-                             (x_ver,
-                              y_ver + (1 - 3 * self.padding) *
-                              self.scale_factor,
-                                 ceil(self.scale_factor * self.eye_size),
-                                 ceil(self.scale_factor * self.eye_size)))
-        elif direction_ver != 0:
-            x_ver = ceil((head_col + self.padding) * self.scale_factor)
-            y_ver = ceil((head_row + .5 - self.eye_size + self.padding *
-                          direction_ver) * self.scale_factor)
-            pygame.draw.rect(self.screen, self.eye_color,
-                             (x_ver,
-                              y_ver,
-                              ceil(self.scale_factor * self.eye_size),
-                                 ceil(self.scale_factor * self.eye_size)))
-            pygame.draw.rect(self.screen, self.eye_color,
-                             (x_ver + (1 - 3 * self.padding) * self.scale_factor,
-                              y_ver,
-                              ceil(self.scale_factor * self.eye_size),
-                                 ceil(self.scale_factor * self.eye_size)))
-
-        pygame.display.flip()
+        return self._eyes
 
-    def draw_gameover(self):
+    @property
+    def cell_areas(self):
         """
-        Draw the gameover screen to the pygame surface and update the screen
-
-        Args:
-            None
-        Returns:
-            No return value
+        Return the areas of the tiles surface for each cell code
         """
-        line_1_location = self.scale_factor * self.board.size / \
-            2, self.scale_factor * self.board.size / 4
-        line_2_location = self.scale_factor * \
-            self.board.size / 2, line_1_location[1] + 50
-        line_3_location = self.scale_factor * self.board.size / \
-            2, self.scale_factor * self.board.size / 2
-
-        font_game_over = pygame.font.SysFont(None, 70)
-        font_text = pygame.font.SysFont(None, 35)
+        return self._cell_areas
 
-        end_msg_line_1 = font_game_over.render("GAME OVER", True, (255, 0, 0))
-        end_msg_line_2 = font_text.render(
-            f"Your final length was {self.board.snake_length}", True, (255, 0, 0))
-        restart_msg = font_text.render("Restart? ( y / n )", True, (255, 0, 0))
-
-        self.screen.fill((0, 0, 0))
-
-        self.screen.blit(end_msg_line_1, end_msg_line_1.get_rect(
-            center=line_1_location))
-        self.screen.blit(end_msg_line_2, end_msg_line_2.get_rect(
-            center=line_2_location))
-        self.screen.blit(restart_msg, restart_msg.get_rect(
-            center=line_3_location))
-
-        pygame.display.flip()
-
-    def start_text(self):
+    @property
+    def shade_areas(self):
         """
-        Draw the starting intstructions to the screen and update the screen
+        Return the areas of the tiles surface for each snake shade
+        """
+        return self._shade_areas
 
-        Args:
-            None
-        Returns:
-            No return value
+    @property
+    def eye_areas(self):
         """
-        location = self.scale_factor * self.board.size / \
-            2, floor(self.board.size / 4 * self.scale_factor)
+        Return the areas of the eyes surface for each direction code
+        """
+        return self._eye_areas
 
-        font = pygame.font.SysFont(None, 30)
+    def _area(self, index, columns=None):
+        """
+        Return the Rect of the sprite at index in a grid of sprites
+        """
+        row, col = divmod(index, columns or self.columns)
+        return pygame.Rect(col * self._scale_factor, row * self._scale_factor,
+                           self._scale_factor, self._scale_factor)
 
-        start_text = font.render(
-            "Press an Arrow Key to Start Moving", True, (0, 128, 0))
-        text_background = start_text.get_rect(center=location)
 
-        pygame.draw.rect(self.screen, (255, 255, 255), text_background)
-        self.screen.blit(start_text, text_background)
+@lru_cache(maxsize=None)
+def get_atlas(scale_factor, eye_color=(200, 200, 0), eye_size=.125,
+              padding=.2):
+    """
+    Return the TileAtlas for the given scale factor and eyes, rendering each
+    one once
+
+    Args:
+        scale_factor: an int for the side length, in pixels, of a sprite
+        eye_color: a tuple for the RGB value of the snake's eyes
+        eye_size: a float for the size of the eyes relative to a square
+        padding: a float for the distance of the eyes from the edge of the
+        head relative to a square
+    Returns:
+        a TileAtlas
+    """
+    return TileAtlas(scale_factor, eye_color, eye_size, padding)
 
-        pygame.display.update()
 
-class PygameViewRL(SnakeView):
+class PygameView(SnakeView):
     """
     Class for displaying the gameboard using a pygame screen, which inherits
     from SnakeView
@@ -341,29 +398,46 @@ class PygameViewRL(SnakeView):
         _eye_size: an int representing the size of the snake's eyes
         _padding: an int representing the dist. the snake's eyes are from the
         edge of the head
+        _atlas: the TileAtlas the board is drawn from
+        _full_redraw: a boolean for whether the next frame must redraw the
+        whole board
+        _tracked_board: the gameboard whose changes the view is following
+        _text_screen: a tuple naming the text screen currently shown, or None
+        while the board is shown
     """
 
-    def __init__(self, board_instance):
+    def __init__(self, board_instance, scale_factor=45, screen=None):
         """
         Initialize the pygame view using the gameboard that will be visualized
         and set up the pygame screen dimensions and snake colors
 
         Args:
             board_instance: a gameboard
+            scale_factor: an int for the side length, in pixels, of a square
+            screen: an optional pygame surface to draw on instead of opening
+            a display window
         Returns:
             No return value
         """
         super().__init__(board_instance)
 
-        self._scale_factor = 45
+        self._scale_factor = scale_factor
         self._screen_size = self.board.size * \
             self._scale_factor, self.board.size * self._scale_factor
-        self._screen = pygame.display.set_mode(self._screen_size)
+        if screen is None:
+            screen = pygame.display.set_mode(self._screen_size)
+        self._screen = screen
 
         self._buffer = 20  # Higher buffer means lighter snake in general
         self._eye_color = (200, 200, 0)
         self._eye_size = .125
         self._padding = .2
+        self._atlas = get_atlas(self._scale_factor, self._eye_color,
+                                self._eye_size, self._padding)
+
+        self._full_redraw = True
+        self._tracked_board = None
+        self._text_screen = None
 
     @property
     def scale_factor(self):
@@ -438,68 +512,130 @@ class PygameViewRL(SnakeView):
         """
         return self._padding
 
+    @property
+    def atlas(self):
+        """
+        Return the TileAtlas the board is drawn from, which is a private
+        attribute
+        """
+        return self._atlas
+
     def draw(self):
         """
         Draw the current state of the board to the screen and update the screen
 
+        Only the squares the model changed since the last frame and the snake
+        (whose colors shift every move) are redrawn, and only their rects are
+        updated on the display. The whole board is drawn on the first frame
+        and after a text screen. Every square is copied from the TileAtlas in
+        one batched blit.
+
         Args:
             None
         Returns:
             None
         """
-        for row_index, row in enumerate(self.board.board_array):
-            for col_index, item in enumerate(row):
-                pygame.draw.rect(self.screen, item.color, pygame.Rect(
-                    col_index * self.scale_factor,
-                    row_index * self.scale_factor, self.scale_factor,
-                    self.scale_factor))
-
-        for index, square in enumerate(self.board.snake):
-            item = self.board.get_square(square)
-            color_factor = (index + self.buffer / 2) / \
-                (self.board.snake_length + self.buffer)
-            color = [item.color[0], item.color[1], item.color[2]]
-            color = [color_factor * value for value in color]
-            pygame.draw.rect(self.screen, color, pygame.Rect(
-                square[1] * self.scale_factor,
-                square[0] * self.scale_factor, self.scale_factor,
-                self.scale_factor))
-
-        head_row = self.board.snake[0][0]
-        head_col = self.board.snake[0][1]
-        direction_ver = self.board.direction[0]
-        direction_hor = self.board.direction[1]
-        if direction_hor != 0:
-            x_ver = ceil((head_col + 0.5 - self.eye_size + 0.125 *
-                          direction_hor) * self.scale_factor)
-            y_ver = ceil((head_row + self.padding) * self.scale_factor)
-            pygame.draw.rect(self.screen, self.eye_color,
-                             (x_ver,
-                              y_ver,
-                              ceil(self.scale_factor * self.eye_size),
-                                 ceil(self.scale_factor * self.eye_size)))
-            pygame.draw.rect(self.screen, self.eye_color,
-                             (x_ver,
-                              y_ver + (1 - 3 * self.padding) *
-                              self.scale_factor,
-                                 ceil(self.scale_factor * self.eye_size),
-                                 ceil(self.scale_factor * self.eye_size)))
-        elif direction_ver != 0:
-            x_ver = ceil((head_col + self.padding) * self.scale_factor)
-            y_ver = ceil((head_row + .5 - self.eye_size + self.padding *
-                          direction_ver) * self.scale_factor)
-            pygame.draw.rect(self.screen, self.eye_color,
-                             (x_ver,
-                              y_ver,
-                              ceil(self.scale_factor * self.eye_size),
-                                 ceil(self.scale_factor * self.eye_size)))
-            pygame.draw.rect(self.screen, self.eye_color,
-                             (x_ver + (1 - 3 * self.padding) * self.scale_factor,
-                              y_ver,
-                              ceil(self.scale_factor * self.eye_size),
-                                 ceil(self.scale_factor * self.eye_size)))
+        dirty = self._render()
+        if dirty is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update([self._square_rect(row_index, col_index)
+                                   for row_index, col_index in dirty])
 
-        pygame.display.flip()
+    def _render(self):
+        """
+        Draw the current state of the board to the screen surface without
+        updating the display
+
+        Returns:
+            None if the whole board was drawn, otherwise the set of (row, col)
+            squares that were drawn
+        """
+        if self._tracked_board is not self.board:
+            self.board.track_changes()
+            self._tracked_board = self.board
+            self._full_redraw = True
+
+        self._text_screen = None
+        changes = self.board.pop_changes()
+        scale = self.scale_factor
+        tiles = self._atlas.tiles
+        cell_areas = self._atlas.cell_areas
+
+        if self._full_redraw:
+            sprites = [(tiles, (col_index * scale, row_index * scale),
+                        cell_areas[code])
+                       for row_index, row in enumerate(self.board.grid.tolist())
+                       for col_index, code in enumerate(row)]
+            sprites += self._snake_sprites()
+            self.screen.blits(sprites, doreturn=False)
+            self._full_redraw = False
+            return None
+
+        dirty = set(changes)
+        dirty.update((square[0], square[1])
+                     for square in self.board.iter_snake())
+        grid = self.board.grid
+        sprites = [(tiles, (col_index * scale, row_index * scale),
+                    cell_areas[grid[row_index, col_index]])
+                   for row_index, col_index in dirty]
+        sprites += self._snake_sprites()
+        self.screen.blits(sprites, doreturn=False)
+        return dirty
+
+    def _square_rect(self, row_index, col_index):
+        """
+        Return the pygame Rect of a square of the board on the screen
+        """
+        return pygame.Rect(col_index * self.scale_factor,
+                           row_index * self.scale_factor, self.scale_factor,
+                           self.scale_factor)
+
+    def _snake_sprites(self):
+        """
+        Return the blits for the snake, with shades getting lighter towards
+        the tail, and for the eyes on the head facing the direction of motion
+        """
+        scale = self.scale_factor
+        tiles = self._atlas.tiles
+        shade_areas = self._atlas.shade_areas
+        top_shade = TileAtlas.shades - 1
+        offset = self.buffer / 2
+        total = self.board.snake_length + self.buffer
+        sprites = [(tiles, (square[1] * scale, square[0] * scale),
+                    shade_areas[int((index + offset) / total * top_shade)])
+                   for index, square in enumerate(self.board.iter_snake())]
+
+        direction_code = self.board.direction_code
+        if direction_code is not None:
+            head = self.board.head
+            sprites.append((self._atlas.eyes, (head[1] * scale, head[0] * scale),
+                            self._atlas.eye_areas[direction_code]))
+        return sprites
+
+    def invalidate(self):
+        """
+        Make the next call to draw redraw the whole board
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+        self._full_redraw = True
+
+    def quit(self):
+        """
+        Drop the cached fonts, text surfaces and tile atlases and shut pygame
+        down
+
+        Args:
+            None
+        Returns:
+            No return value
+        """
+        clear_caches()
+        pygame.quit()
 
     def draw_gameover(self):
         """
@@ -510,6 +646,10 @@ class PygameViewRL(SnakeView):
         Returns:
             No return value
         """
+        text_screen = ("gameover", self.board.snake_length)
+        if self._text_screen == text_screen:
+            return
+
         line_1_location = self.scale_factor * self.board.size / \
             2, self.scale_factor * self.board.size / 4
         line_2_location = self.scale_factor * \
@@ -517,13 +657,10 @@ class PygameViewRL(SnakeView):
         line_3_location = self.scale_factor * self.board.size / \
             2, self.scale_factor * self.board.size / 2
 
-        font_game_over = pygame.font.SysFont(None, 70)
-        font_text = pygame.font.SysFont(None, 35)
-
-        end_msg_line_1 = font_game_over.render("GAME OVER", True, (255, 0, 0))
-        end_msg_line_2 = font_text.render(
-            f"Your final length was {self.board.snake_length}", True, (255, 0, 0))
-        restart_msg = font_text.render("Restart? ( y / n )", True, (255, 0, 0))
+        end_msg_line_1 = render_text("GAME OVER", 70, (255, 0, 0))
+        end_msg_line_2 = render_text(
+            f"Your final length was {self.board.snake_length}", 35, (255, 0, 0))
+        restart_msg = render_text("Restart? ( y / n )", 35, (255, 0, 0))
 
         self.screen.fill((0, 0, 0))
 
@@ -535,6 +672,8 @@ class PygameViewRL(SnakeView):
             center=line_3_location))
 
         pygame.display.flip()
+        self._full_redraw = True
+        self._text_screen = text_screen
 
     def start_text(self):
         """
@@ -545,17 +684,139 @@ class PygameViewRL(SnakeView):
         Returns:
             No return value
         """
+        text_screen = ("start",)
+        if self._text_screen == text_screen:
+            return
+
         location = self.scale_factor * self.board.size / \
             2, floor(self.board.size / 4 * self.scale_factor)
 
-        font = pygame.font.SysFont(None, 30)
-
-        start_text = font.render(
-            "Press an Arrow Key to Start Moving", True, (0, 128, 0))
+        start_text = render_text(
+            "Press an Arrow Key to Start Moving", 30, (0, 128, 0))
         text_background = start_text.get_rect(center=location)
 
         pygame.draw.rect(self.screen, (255, 255, 255), text_background)
         self.screen.blit(start_text, text_background)
 
         pygame.display.update()
+        self._full_redraw = True
+        self._text_screen = text_screen
+
+
+class PygameViewRL(PygameView):
+    """
+    Pygame view used by the reinforcement learning game, which draws the
+    board exactly like PygameView
+    """
+
+
+class RenderScheduler:
+    """
+    Decides which simulation steps are drawn, so a view can watch training
+    without slowing it down. It can draw every k-th step, draw one episode in
+    N, and cap the frame rate either by dropping frames (the simulation keeps
+    running flat out) or by waiting (to watch at a steady speed).
 
+    Attributes:
+        _view: the view to draw, e.g. a PygameView
+        _render_every: an int for the number of steps per drawn frame
+        _episode_every: an int for the number of episodes per drawn episode
+        _max_fps: an optional int for the most frames drawn per second
+        _throttle: a boolean for whether to wait to hold _max_fps instead of
+        dropping frames
+        _clock: a pygame.time.Clock measuring the drawn frames
+        _get_ticks: a function returning the current time in milliseconds
+        _episode: an int for the number of episodes started
+        _step: an int for the number of steps in the current episode
+        _last_frame: an int for the pygame ticks when the last frame was drawn
+        _rendering: a boolean for whether the current episode is drawn
+    """
+
+    def __init__(self, view, render_every=1, episode_every=1, max_fps=None,
+                 throttle=False, clock=None, get_ticks=None):
+        """
+        Initialize the scheduler for a view
+
+        Args:
+            view: the view to draw
+            render_every: an int for the number of steps per drawn frame
+            episode_every: an int for the number of episodes per drawn episode
+            max_fps: an optional int for the most frames drawn per second
+            throttle: a boolean, True to wait between frames to hold max_fps
+            and False to drop frames that come too soon
+            clock: an optional object with the tick and get_fps methods of
+            pygame.time.Clock, a new Clock by default
+            get_ticks: an optional function returning the current time in
+            milliseconds, pygame.time.get_ticks by default
+        Returns:
+            No return value
+        """
+        self._view = view
+        self._render_every = render_every
+        self._episode_every = episode_every
+        self._max_fps = max_fps
+        self._throttle = throttle
+        self._clock = pygame.time.Clock() if clock is None else clock
+        self._get_ticks = get_ticks or pygame.time.get_ticks
+        self._episode = 0
+        self._step = 0
+        self._last_frame = None
+        self._rendering = True
+
+    @property
+    def rendering(self):
+        """
+        Return True if the current episode is drawn
+        """
+        return self._rendering
+
+    @property
+    def fps(self):
+        """
+        Return the average number of frames drawn per second recently
+        """
+        return self._clock.get_fps()
+
+    def start_episode(self):
+        """
+        Start a new episode, deciding whether it is drawn
+
+        Args:
+            None
+        Returns:
+            True if the episode is drawn, False otherwise
+        """
+        was_rendering = self._rendering
+        self._rendering = self._episode % self._episode_every == 0
+        self._episode += 1
+        self._step = 0
+        if self._rendering and not was_rendering:
+            self._view.invalidate()
+        return self._rendering
+
+    def step(self):
+        """
+        Count a simulation step and draw the view if the step is due
+
+        Args:
+            None
+        Returns:
+            True if a frame was drawn, False otherwise
+        """
+        self._step += 1
+        if not self._rendering or self._step % self._render_every != 0:
+            return False
+
+        if self._max_fps is not None and not self._throttle:
+            now = self._get_ticks()
+            if self._last_frame is not None and \
+                    now - self._last_frame < 1000 / self._max_fps:
+                return False
+            self._last_frame = now
+
+        self._view.draw()
+        if self._throttle and self._max_fps is not None:
+            self._clock.tick(self._max_fps)
+        else:
+            self._clock.tick()
+        return True
@@ -0,0 +1,82 @@
+"""
+This module deals with testing some of the functions in the snake_benchmark
+module.
+"""
+import json
+import os
+import subprocess
+import sys
+import pytest
+from snake_benchmark import CONTROLLERS, benchmark_controller, run_benchmark
+from snake_controller import RLPlayer
+from snake_qtable import QTable
+
+
+@pytest.mark.parametrize("name", sorted(CONTROLLERS))
+def test_benchmark_controller(name, tmp_path):
+    """
+    Test that every controller plays the asked number of games and that the
+    measurements are consistent with each other.
+    """
+    agent = tmp_path / "agent.csv"
+    QTable.new(RLPlayer.initial_reward).write(agent)
+    result = benchmark_controller(name, 3, side=8, seed=1, agent=agent,
+                                  max_steps=500, cache_dir=tmp_path)
+
+    assert result["episodes"] == 3
+    assert 0 < result["steps"] <= 3 * 500
+    assert result["step_latency_us"]["p50"] <= \
+        result["step_latency_us"]["p99"] <= result["step_latency_us"]["max"]
+    assert 1 <= result["length"]["mean"] <= result["length"]["max"] <= 36
+
+
+def test_run_benchmark_is_json(tmp_path):
+    """
+    Test that the report can be written as JSON, holds a result for every
+    controller and plays the same games for the same seed.
+    """
+    report = run_benchmark(["hamiltonian", "path"], 2, side=6, seed=4,
+                           cache_dir=tmp_path)
+    again = run_benchmark(["hamiltonian", "path"], 2, side=6, seed=4,
+                          cache_dir=tmp_path)
+
+    assert set(json.loads(json.dumps(report))["results"]) == \
+        {"hamiltonian", "path"}
+    assert report["results"]["hamiltonian"]["length"]["max"] == 16
+    for name in ("hamiltonian", "path"):
+        assert report["results"][name]["steps"] == \
+            again["results"][name]["steps"]
+
+
+def test_run_benchmark_keeps_other_results(tmp_path):
+    """
+    Test that a controller that fails gets an error entry while the others
+    are still measured, and that an agent path is written as a string.
+    """
+    report = run_benchmark(["rl", "hamiltonian", "path"], 1, side=7, seed=0,
+                           cache_dir=None)
+    assert report["results"]["rl"]["error"].startswith("ValueError")
+    assert report["results"]["hamiltonian"]["error"].startswith("ValueError")
+    assert report["results"]["path"]["episodes"] == 1
+
+    agent = tmp_path / "agent.csv"
+    QTable.new(RLPlayer.initial_reward).write(agent)
+    report = run_benchmark(["rl"], 1, side=6, agent=agent, max_steps=50)
+    assert json.loads(json.dumps(report))["settings"]["agent"] == str(agent)
+    assert report["results"]["rl"]["episodes"] == 1
+
+
+def test_cli_default_controllers(tmp_path):
+    """
+    Test that running the module without controllers benchmarks the default
+    ones and writes nothing but the JSON report to stdout.
+    """
+    output = subprocess.run(
+        [sys.executable, "snake_benchmark.py", "--episodes", "1", "--side",
+         "6", "--max-steps", "100", "--cache-dir", str(tmp_path)],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True,
+        text=True, check=True).stdout
+
+    assert list(json.loads(output)["results"]) == \
+        ["markov", "rl", "path", "hamiltonian"]
+    assert [file.name for file in tmp_path.iterdir()] == ["hamiltonian_6.npy"]
@@ -2,10 +2,15 @@
 This module deals with testing some of the functions in the snake_controller
 module.
 """
+import os
+import numpy as np
 import pytest
 import pygame
-from snake_controller import SnakePlayer, get_restart_input, check_input_list
-from snake_model import GameBoard
+from snake_controller import (SnakePlayer, MarkovPolicy, RLPlayer,
+                              PathPlayer, HamiltonianPlayer, hamiltonian_cycle,
+                              is_hamiltonian_cycle, CYCLE_CACHE_DIR,
+                              get_restart_input, check_input_list)
+from snake_model import GameBoard, Border
 
 
 GET_INPUT_CASES = [
@@ -97,3 +102,210 @@ def test_restart_input_cases(test_input, expected):
         pygame.KEYDOWN, key=test_input)  # create the event
     pygame.event.post(newevent)  # add the event to the queue
     assert get_restart_input() == expected
+
+
+# general structure:
+# ([empty, to_apple, apple], expected direction index)
+MARKOV_CHOOSE_CASES = [
+    # only moving right is not blocked
+    ([[False, True, False, False], [True, False, True, True],
+      [False, False, False, False]], 1),
+    # the apple is straight up
+    ([[True, True, True, True], [False, False, True, False],
+      [False, False, True, False]], 2),
+    # moving toward the apple beats moving away from it
+    ([[True, True, True, True], [True, False, False, False],
+      [False, False, False, False]], 0),
+]
+
+
+@pytest.mark.parametrize("test_input,expected", MARKOV_CHOOSE_CASES)
+def test_markov_choose(test_input, expected):
+    """
+    Test that the Markov policy picks the same direction for a single board
+    and for every board of a batch.
+
+    Test cases are commented next to the variable MARKOV_CHOOSE_CASES
+    """
+    policy = MarkovPolicy(seed=0)
+    assert policy.choose(*test_input) == expected
+
+    batch = [np.array([state] * 5) for state in test_input]
+    assert (policy.choose(*batch) == expected).all()
+
+
+def test_markov_seeded_ties():
+    """
+    Test that ties are broken at random among the best directions only, and
+    that the same seed breaks them the same way.
+    """
+    empty = np.ones((200, 4), dtype=bool)
+    to_apple = np.tile([True, True, False, False], (200, 1))
+    apple = np.zeros((200, 4), dtype=bool)
+
+    choices = MarkovPolicy(seed=3).choose(empty, to_apple, apple)
+    assert set(choices.tolist()) == {0, 1}
+    assert (MarkovPolicy(seed=3).choose(empty, to_apple, apple)
+            == choices).all()
+
+
+def test_path_distance_around_wall():
+    """
+    Test that the distance field goes around a wall between the head and the
+    apple and that the snake heads for the gap instead of into the wall.
+    """
+    board = GameBoard(10, seed=0)
+    assert board.apple == [7, 7] and board.head == [5, 5]
+    for col in range(1, 8):
+        board.mark_square([6, col], Border())
+    controls = PathPlayer(board)
+    controls.act()
+
+    assert controls.distance([7, 7]) == 0
+    assert controls.distance([5, 6]) == 5
+    assert controls.distance([6, 5]) == PathPlayer.unreachable
+    assert board.direction == [0, 1]
+
+
+def test_path_field_matches_fresh_search():
+    """
+    Test that the field patched after every move equals the field searched
+    from scratch, and that it is only searched again when the apple moves.
+    """
+    board = GameBoard(10, seed=3)
+    controls = PathPlayer(board)
+    apples = 0
+    while not board.end_condition:
+        controls.act()
+        fresh = PathPlayer(board)
+        for row in range(board.size):
+            for col in range(board.size):
+                assert controls.distance([row, col]) == \
+                    fresh.distance([row, col])
+        apple = board.apple
+        board.check_next_square()
+        apples += board.apple != apple
+
+    assert board.snake_length > 5
+    assert controls.full_searches == apples + 1
+
+
+def test_rl_export_batches_records(tmp_path):
+    """
+    Test that finished games are buffered until the game record is closed,
+    and that a player without an agent or record path can finish games.
+    """
+    record = tmp_path / "record.csv"
+    controls = RLPlayer(GameBoard(8, seed=1), None, str(record))
+    for _ in range(3):
+        controls.act()
+        controls.export_at_endgame()
+
+    assert record.read_text(encoding="utf-8").count("\n") == 1
+    controls.close()
+    assert record.read_text(encoding="utf-8").count("\n") == 4
+
+    unsaved = RLPlayer(GameBoard(8, seed=1), None, None)
+    unsaved.act()
+    unsaved.export_at_endgame()
+    unsaved.close()
+
+
+@pytest.mark.parametrize("size", [4, 6, 10])
+def test_hamiltonian_cycle(size, tmp_path):
+    """
+    Test that the cycle visits every square inside the borders once, that
+    consecutive squares are neighbors, and that it is read back from the
+    disk cache.
+    """
+    order = hamiltonian_cycle(size, tmp_path)
+    squares = np.argwhere(order >= 0)[np.argsort(order[order >= 0])]
+
+    assert len(squares) == (size - 2) ** 2
+    assert (order[0] == -1).all() and (order[:, -1] == -1).all()
+    steps = np.abs(np.roll(squares, -1, axis=0) - squares).sum(axis=1)
+    assert (steps == 1).all()
+    assert (tmp_path / f"hamiltonian_{size}.npy").exists()
+    assert (hamiltonian_cycle(size, tmp_path) == order).all()
+
+
+# general structure:
+# (how the cached cycle of a board of size 6 is damaged)
+BROKEN_CYCLE_CASES = [
+    "truncated",  # the file ends partway through
+    "shape",  # the cycle of another board size
+    "dtype",  # float positions
+    "values",  # a position repeated and another missing
+    "steps",  # two positions swapped, so the cycle jumps between squares
+]
+
+
+@pytest.mark.parametrize("damage", BROKEN_CYCLE_CASES)
+def test_hamiltonian_cycle_rebuilds_cache(damage, tmp_path):
+    """
+    Test that a damaged cached cycle is rebuilt and overwritten instead of
+    being used.
+
+    Test cases are commented next to the variable BROKEN_CYCLE_CASES
+    """
+    expected = hamiltonian_cycle(6, None)
+    path = tmp_path / "hamiltonian_6.npy"
+    broken = expected.copy()
+    if damage == "truncated":
+        np.save(path, expected)
+        path.write_bytes(path.read_bytes()[:-20])
+    else:
+        if damage == "shape":
+            broken = hamiltonian_cycle(8, None)
+        elif damage == "dtype":
+            broken = expected.astype(float)
+        elif damage == "values":
+            broken[1, 1] = broken[1, 2]
+        else:
+            broken[[1, 3], [1, 1]] = broken[[3, 1], [1, 1]]
+        assert not is_hamiltonian_cycle(broken, 6)
+        np.save(path, broken)
+
+    assert (hamiltonian_cycle(6, tmp_path) == expected).all()
+    assert (np.load(path) == expected).all()
+
+
+def test_hamiltonian_cycle_unwritable_cache(tmp_path):
+    """
+    Test that a cache directory that cannot be created is skipped, and that
+    cycles are not cached inside the source tree by default.
+    """
+    blocker = tmp_path / "blocker"
+    blocker.write_text("not a directory")
+    order = hamiltonian_cycle(6, blocker / "cycles")
+
+    assert (order == hamiltonian_cycle(6, None)).all()
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+    assert not CYCLE_CACHE_DIR.startswith(source_dir + os.sep)
+
+
+def test_hamiltonian_cycle_odd_board():
+    """
+    Test that a board with an odd number of squares per side is refused.
+    """
+    with pytest.raises(ValueError):
+        hamiltonian_cycle(7, None)
+
+
+@pytest.mark.parametrize("shortcuts", [False, True])
+def test_hamiltonian_fills_board(shortcuts):
+    """
+    Test that following the cycle, with or without shortcuts, fills the
+    whole board without crashing.
+    """
+    board = GameBoard(8, seed=2)
+    controls = HamiltonianPlayer(board, shortcuts, cache_dir=None)
+    steps = 0
+    while not board.end_condition:
+        controls.act()
+        board.check_next_square()
+        steps += 1
+
+    assert board.snake_length == 6 * 6
+    assert board.apple is None
+    assert steps < 36 * 36
@@ -3,7 +3,7 @@ This module deals with testing some of the functions in the snake_model
 module.
 """
 import pytest
-from snake_model import GameBoard, Apple, Blank, Snake
+from snake_model import GameBoard, Apple, Blank, Snake, BORDER, SNAKE, APPLE
 
 CHANGE_DIRECTION_CASES = [
     ([1, 0], [1, 0]),  # changing direction to down updates attribute to down
@@ -190,3 +190,278 @@ def test_check_next_square(test_input, expected):
             num_steps -= 1
 
     assert [test_board.snake, test_board.end_condition] == expected
+
+
+GRID_CASES = [
+    ([0, 0], BORDER),  # the corner of the board is a border code
+    ([9, 4], BORDER),  # the bottom row of the board is a border code
+    ([5, 5], SNAKE),  # the starting position of the snake is a snake code
+]
+
+
+@pytest.mark.parametrize("test_input,expected", GRID_CASES)
+def test_grid(test_input, expected):
+    """
+    Test that the int8 grid holds the expected cell code and that get_square
+    returns the shared Object instance for that code.
+
+    Test cases are commented next to the variable GRID_CASES
+    """
+    test_board = GameBoard(10)
+
+    assert test_board.grid.dtype == "int8"
+    assert test_board.grid[test_input[0], test_input[1]] == expected
+    assert test_board.get_square(test_input).code == expected
+
+
+def test_mark_square_updates_grid():
+    """
+    Test that marking a square with an Object instance stores its cell code,
+    and that the square reads back as the shared instance for that code.
+    """
+    test_board = GameBoard(10)
+    test_board.mark_square([2, 3], Apple())
+
+    assert test_board.grid[2, 3] == APPLE
+    assert test_board.get_square([2, 3]) is test_board.get_square(
+        test_board.apple)
+
+
+def test_head_and_tail():
+    """
+    Test that the head and tail of the deque-backed snake follow its moves and
+    that the squares it occupies are reported as blocked.
+    """
+    test_board = GameBoard(10)
+    test_board.change_direction([-1, 0])
+    test_board.increase_length()
+    test_board.increase_length()
+
+    assert test_board.head == [3, 5]
+    assert test_board.tail == [5, 5]
+    assert all(test_board.is_blocked(square) for square in test_board.snake)
+    assert not test_board.is_blocked([2, 5])
+    assert list(test_board.iter_snake()) == test_board.snake
+    assert next(test_board.iter_snake()) is test_board.head
+
+
+def test_free_squares():
+    """
+    Test that the free-cell index matches the Blank squares on the grid after
+    the snake moves and eats, so apples can only spawn on Blank squares.
+    """
+    test_board = GameBoard(10)
+    test_board.change_direction([-1, 0])
+    test_board.increase_length()
+    test_board.maintain_velocity()
+
+    blank_squares = [[row, col] for row in range(10) for col in range(10)
+                     if isinstance(test_board.get_square([row, col]), Blank)]
+    assert test_board.free_squares == len(blank_squares)
+    for _ in range(50):
+        assert test_board.choose_apple_square() in blank_squares
+
+
+def test_spawn_apple_full_board():
+    """
+    Test that the game ends instead of failing when no Blank square is left to
+    place an apple on.
+    """
+    test_board = GameBoard(4)
+    for row in range(1, 3):
+        for col in range(1, 3):
+            test_board.mark_square([row, col], Snake())
+    test_board.spawn_apple()
+
+    assert test_board.apple is None
+    assert test_board.end_condition
+
+
+# general structure:
+# ([direction, vector from the head], vector signs in the snake frame)
+VEC2SNAKEFRAME_CASES = [
+    ([[1, 0], [2, -3]], [1, -1]),  # moving down keeps the board frame
+    ([[0, 1], [0, 4]], [-1, 0]),  # moving right rotates by a quarter turn
+    ([[-1, 0], [-2, 0]], [1, 0]),  # moving up rotates by a half turn
+    ([[0, -1], [3, 1]], [1, -1]),  # moving left rotates by three quarters
+]
+
+
+@pytest.mark.parametrize("test_input,expected", VEC2SNAKEFRAME_CASES)
+def test_vec2snakeframe(test_input, expected):
+    """
+    Test that vec2snakeframe rotates vectors with the integer rotation table
+    for the current direction, matching R_angle(angular_direction).
+
+    Test cases are commented next to the variable VEC2SNAKEFRAME_CASES
+    """
+    test_board = GameBoard(10)
+    test_board.change_direction(test_input[0])
+
+    assert test_board.vec2snakeframe(test_input[1]) == expected
+
+
+# general structure:
+# ([direction, num steps], [walls to the left, straight and right])
+SURROUNDING_WALLS_CASES = [
+    ([[0, -1], 4], [False, True, False]),  # border straight ahead
+    ([[-1, 0], 4], [True, True, False]),  # up into the top left corner
+    ([[1, 0], 2], [False, False, True]),  # down along the left border
+]
+
+
+@pytest.mark.parametrize("test_input,expected", SURROUNDING_WALLS_CASES)
+def test_surrounding_walls(test_input, expected):
+    """
+    Test that surrounding_walls uses the turn tables to check the squares to
+    the snake's left, straight ahead and right.
+
+    Test cases are commented next to the variable SURROUNDING_WALLS_CASES
+    """
+    test_board = GameBoard(10)
+    test_board.mark_square(test_board.apple, Blank())
+    test_board.change_direction([0, -1])
+    for _ in range(4):
+        test_board.maintain_velocity()
+    test_board.change_direction(test_input[0])
+    if test_input[0] != [0, -1]:
+        for _ in range(test_input[1]):
+            test_board.maintain_velocity()
+
+    assert test_board.surrounding_walls == expected
+
+
+def test_turn():
+    """
+    Test that turning left four times brings the snake back to its direction
+    and that turn follows the DIRECTIONS order.
+    """
+    test_board = GameBoard(10)
+    directions = []
+    for _ in range(4):
+        test_board.turn(1)
+        directions.append(test_board.direction)
+
+    assert directions == [[0, 1], [-1, 0], [0, -1], [1, 0]]
+    test_board.turn(-1)
+    assert test_board.direction_code == 3
+
+
+def test_turn_without_direction():
+    """
+    Test that turning fails clearly when the snake is not moving in one of
+    the four directions, and works again once one is set.
+    """
+    test_board = GameBoard(10)
+    test_board.change_direction([0, 0])
+
+    with pytest.raises(ValueError):
+        test_board.turn(1)
+    test_board.change_direction([0, 1])
+    test_board.turn(1)
+    assert test_board.direction == [-1, 0]
+
+
+def test_reset():
+    """
+    Test that reset restores a played board to the starting layout in place
+    and that seeded games place their apples the same way.
+    """
+    test_board = GameBoard(10, seed=4)
+    first_apple = test_board.apple
+    grid = test_board.grid
+    test_board.change_direction([0, -1])
+    test_board.increase_length()
+    for _ in range(5):
+        test_board.check_next_square()
+    test_board.reset(4)
+
+    assert test_board.grid is grid
+    assert test_board.snake == [[5, 5]]
+    assert test_board.direction == [1, 0]
+    assert not test_board.end_condition
+    assert test_board.apple == first_apple
+    assert test_board.free_squares == 8 * 8 - 2
+    assert (test_board.grid == GameBoard(10, seed=4).grid).all()
+
+
+def test_reset_after_marking():
+    """
+    Test that reset also clears squares marked outside of the game.
+    """
+    test_board = GameBoard(10, seed=1)
+    test_board.mark_square([2, 2], Snake())
+    test_board.mark_square([7, 3], Apple())
+    test_board.reset(1)
+
+    assert (test_board.grid == GameBoard(10, seed=1).grid).all()
+    assert test_board.free_squares == 8 * 8 - 2
+
+
+def test_reset_after_balanced_marking():
+    """
+    Test that reset clears marked squares even when the marks leave the
+    number of free squares unchanged.
+    """
+    test_board = GameBoard(10, seed=1)
+    test_board.mark_square(test_board.apple, Blank())
+    test_board.mark_square([2, 2], Snake())
+    test_board.reset(1)
+
+    assert (test_board.grid == GameBoard(10, seed=1).grid).all()
+    assert test_board.free_squares == 8 * 8 - 2
+
+
+def test_repr():
+    """
+    Test that the board is represented with one character per square and
+    one line per row.
+    """
+    test_board = GameBoard(5, seed=0)
+
+    assert repr(test_board) == "#####\n#   #\n#   #\n#@ ■#\n#####\n"
+    assert repr(test_board) == "".join(
+        "".join(repr(item) for item in row) + "\n"
+        for row in test_board.board_array)
+
+
+def test_track_changes():
+    """
+    Test that only tracked boards record changed squares, that each square
+    is recorded once however often it changes, and that popping starts a new
+    set.
+    """
+    test_board = GameBoard(10, seed=3)
+    test_board.change_direction([0, -1])
+    test_board.check_next_square()
+    assert test_board.pop_changes() == set()
+
+    test_board.track_changes()
+    test_board.mark_square(test_board.apple, Blank())
+    apple = tuple(test_board.apple)
+    test_board.check_next_square()
+    assert test_board.pop_changes() == {apple, (5, 3), (5, 4)}
+    assert test_board.pop_changes() == set()
+
+    for _ in range(20):
+        test_board.change_direction([0, 1])
+        test_board.maintain_velocity()
+        test_board.change_direction([0, -1])
+        test_board.maintain_velocity()
+    assert test_board.pop_changes() == {(5, 3), (5, 4)}
+
+
+def test_track_changes_after_reset():
+    """
+    Test that reset replaces the changes of the old game with every square
+    inside the borders, so a view that skipped frames draws the new game in
+    full.
+    """
+    test_board = GameBoard(6, seed=3)
+    test_board.track_changes()
+    for _ in range(3):
+        test_board.check_next_square()
+    test_board.reset(3)
+
+    assert test_board.pop_changes() == {(row, col) for row in range(1, 5)
+                                        for col in range(1, 5)}
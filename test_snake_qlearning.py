@@ -0,0 +1,87 @@
+"""
+This module deals with testing some of the functions in the snake_qlearning
+module.
+"""
+import numpy as np
+import pytest
+from snake_qlearning import (QLearner, Constant, ExponentialDecay,
+                             LinearDecay, train_vectorized)
+
+
+SCHEDULE_CASES = [
+    ((Constant(0.5), 10), 0.5),  # constant for every episode
+    ((ExponentialDecay(1.0, 0.5), 2), 0.25),  # halved twice
+    ((ExponentialDecay(1.0, 0.5, 0.2), 5), 0.2),  # stops at the minimum
+    ((LinearDecay(1.0, 0.0, 10), 5), 0.5),  # halfway through the decay
+    ((LinearDecay(1.0, 0.0, 10), 20), 0.0),  # stays at the end value
+    ((LinearDecay(1.0, 0.2, 0), 0), 0.2),  # no decay episodes, at the end
+]
+
+
+@pytest.mark.parametrize("test_input,expected", SCHEDULE_CASES)
+def test_schedules(test_input, expected):
+    """
+    Test the value of each schedule after a number of episodes.
+
+    Test cases are commented next to the variable SCHEDULE_CASES
+    """
+    schedule, episode = test_input
+    assert schedule(episode) == pytest.approx(expected)
+
+
+# general structure:
+# ([sarsa, done], new value of state 0 and action 1)
+UPDATE_CASES = [
+    ([False, False], 0.5 * (1 + 0.9 * 2)),  # Q-learning uses the best action
+    ([True, False], 0.5 * (1 + 0.9 * 1)),  # SARSA uses the next action
+    ([False, True], 0.5 * 1),  # no future value after the game ends
+]
+
+
+@pytest.mark.parametrize("test_input,expected", UPDATE_CASES)
+def test_update(test_input, expected):
+    """
+    Test that a single update moves the value toward the reward plus the
+    discounted value of the next state.
+
+    Test cases are commented next to the variable UPDATE_CASES
+    """
+    learner = QLearner(alpha=0.5, gamma=0.9, sarsa=test_input[0])
+    learner.q[5] = [1, 2, 0]
+    learner.update(0, 1, 1.0, 5, test_input[1], next_action=0)
+
+    assert learner.q[0, 1] == pytest.approx(expected)
+    assert learner.visits[0, 1] == 1
+
+
+def test_update_many_averages_repeats():
+    """
+    Test that repeated state and action pairs in a batch move toward the mean
+    of their targets instead of adding up.
+    """
+    learner = QLearner(alpha=0.5, gamma=0.9)
+    learner.update_many(np.array([3, 3, 4]), np.array([2, 2, 0]),
+                        np.array([1.0, 3.0, -1.0]), np.array([0, 0, 0]),
+                        np.array([True, True, True]))
+
+    assert learner.q[3, 2] == pytest.approx(0.5 * 2)
+    assert learner.q[4, 0] == pytest.approx(-0.5)
+    assert learner.visits[3, 2] == 2
+    assert learner.q.sum() == pytest.approx(0.5)
+
+
+def test_train_vectorized():
+    """
+    Test that vectorized training finishes the asked number of games, counts
+    them in the schedules and ends up playing longer games than it started
+    with.
+    """
+    learner = QLearner(epsilon=LinearDecay(0.1, 0.0, 200), seed=0)
+    lengths = train_vectorized(learner, 400, num_games=32, side=10, seed=0)
+
+    assert len(lengths) == 400
+    assert learner.episodes >= 400
+    assert learner.epsilon == 0.0
+    assert np.mean(lengths[-100:]) > np.mean(lengths[:100])
+    table = learner.to_table()
+    assert np.allclose(table.values(), learner.q)
@@ -0,0 +1,170 @@
+"""
+This module deals with testing some of the functions in the snake_qtable
+module.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from snake_qtable import (NUM_STATES, STATE_COLUMNS, QTable, encode_state,
+                          encode_states, decode_state, encode_rows,
+                          state_table, canonical_order, convert_agent)
+
+
+ENCODE_STATE_CASES = [
+    (([True, True, True], [-1, -1], [-1, -1]), 0),  # first csv row
+    (([True, True, False], [-1, -1], [-1, -1]), 1),  # second csv row
+    (([False, False, False], [1, 1], [1, 1]), 647),  # last csv row
+    (([False, True, False], [0, 1], [1, -1]), 477),  # some state in between
+]
+
+
+@pytest.mark.parametrize("test_input,expected", ENCODE_STATE_CASES)
+def test_encode_state(test_input, expected):
+    """
+    Test that encode_state and encode_states return the row of the state in
+    the agent csv layout and that decode_state maps the index back to the
+    state.
+
+    Test cases are commented next to the variable ENCODE_STATE_CASES
+    """
+    assert encode_state(*test_input) == expected
+    assert encode_states(*([part] for part in test_input)).tolist() == \
+        [expected]
+    assert decode_state(expected) == tuple(list(part) for part in test_input)
+
+
+def test_state_table_matches_csv_layout():
+    """
+    Test that state_table lists the states in the same order as the nested
+    loops the agent csv was originally written with.
+    """
+    rows = []
+    for tail_x in [-1, 0, 1]:
+        for tail_y in [-1, 0, 1]:
+            for apple_x in [-1, 0, 1]:
+                for apple_y in [-1, 0, 1]:
+                    for wall_l in [True, False]:
+                        for wall_s in [True, False]:
+                            for wall_r in [True, False]:
+                                rows.append([wall_l, wall_s, wall_r, apple_x,
+                                             apple_y, tail_x, tail_y])
+
+    assert np.array_equal(state_table(), np.array(rows, dtype=int))
+    assert np.array_equal(encode_rows(rows), np.arange(NUM_STATES))
+
+
+def test_canonical_order():
+    """
+    Test that canonical_order sorts shuffled rows of the saved agent back into
+    index order and rejects tables that are missing states.
+    """
+    states = pd.read_csv("snake1.csv")[STATE_COLUMNS].to_numpy()
+    shuffled = states[np.random.default_rng(0).permutation(NUM_STATES)]
+
+    assert np.array_equal(canonical_order(states), np.arange(NUM_STATES))
+    assert np.array_equal(shuffled[canonical_order(shuffled)], states)
+    with pytest.raises(ValueError):
+        canonical_order(states[:-1])
+
+
+def test_qtable_csv_round_trip(tmp_path):
+    """
+    Test that a QTable loaded from the saved agent writes back the same csv
+    and keeps the sums and counts of each state.
+    """
+    table = QTable.from_csv("snake1.csv")
+    table.to_csv(tmp_path / "agent.csv")
+    df = pd.read_csv("snake1.csv")
+
+    assert (tmp_path / "agent.csv").read_text() == \
+        open("snake1.csv", encoding="utf-8").read()
+    assert np.array_equal(table.q_sums[:, 0], df["Q_k_l"])
+    assert np.array_equal(table.counts[:, 2], df["k_r"])
+
+
+# general structure:
+# ([q sums, counts], set of actions the greedy choice may return)
+GREEDY_CASES = [
+    ([[1, 4, 2], [1, 1, 1]], {1}),  # straight has the highest sum
+    ([[4, 4, 2], [2, 1, 1]], {1}),  # averages are compared, not sums
+    ([[3, 3, 3], [1, 1, 1]], {0, 1, 2}),  # three-way tie
+    ([[5, 1, 5], [1, 1, 1]], {0, 2}),  # tie between left and right
+]
+
+
+@pytest.mark.parametrize("test_input,expected", GREEDY_CASES)
+def test_greedy(test_input, expected):
+    """
+    Test that greedy picks the action with the highest average reward and
+    breaks ties at random for single states and arrays of states.
+
+    Test cases are commented above the variable GREEDY_CASES
+    """
+    table = QTable.new(0, seed=0)
+    table.q_sums[5] = test_input[0]
+    table.counts[5] = test_input[1]
+
+    assert int(table.greedy(5)) in expected
+    actions = table.greedy(np.full(200, 5))
+    assert set(actions.tolist()) == expected
+
+
+def test_update_many():
+    """
+    Test that update_many accumulates repeated state and action pairs the same
+    way as calling update once per reward.
+    """
+    single = QTable.new(2)
+    batched = QTable.new(2)
+    states = np.array([3, 3, 7, 3])
+    actions = np.array([1, 1, 0, 2])
+    rewards = np.array([0.5, -1.0, 1.0, 0.05])
+    for state, action, reward in zip(states, actions, rewards):
+        single.update(state, action, reward)
+    batched.update_many(states, actions, rewards)
+
+    assert np.allclose(single.values(), batched.values())
+    assert batched.counts[3, 1] == 3
+
+
+def test_binary_round_trip(tmp_path):
+    """
+    Test that converting the saved agent to the binary format and back keeps
+    the csv unchanged, and that the binary agent loads memory-mapped.
+    """
+    convert_agent("snake1.csv", tmp_path / "agent.qtable")
+    convert_agent(tmp_path / "agent.qtable", tmp_path / "agent.csv")
+    table = QTable.load(tmp_path / "agent.qtable")
+
+    assert (tmp_path / "agent.csv").read_text() == \
+        open("snake1.csv", encoding="utf-8").read()
+    assert isinstance(table.q_sums.base, np.memmap)
+    assert np.array_equal(table.values(),
+                          QTable.from_csv("snake1.csv").values())
+
+
+def test_binary_updates(tmp_path):
+    """
+    Test that updates to a memory-mapped agent stay in memory until it is
+    saved over its own file.
+    """
+    path = tmp_path / "agent.qtable"
+    QTable.new(2).save(path)
+    table = QTable.load(path)
+    table.update(10, 1, 5.0)
+
+    assert QTable.load(path).q_sums[10, 1] == 2
+    table.save(path)
+    assert QTable.load(path).q_sums[10, 1] == 7
+    assert table.q_sums[10, 1] == 7
+
+
+def test_binary_bad_header(tmp_path):
+    """
+    Test that loading a file that is not a binary agent raises ValueError.
+    """
+    path = tmp_path / "agent.qtable"
+    path.write_bytes(b"not an agent" * 10)
+
+    with pytest.raises(ValueError):
+        QTable.load(path)
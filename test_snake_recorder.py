@@ -0,0 +1,104 @@
+"""
+This module deals with testing some of the functions in the snake_recorder
+module.
+"""
+import threading
+import pygame
+import pytest
+from snake_model import GameBoard
+from snake_recorder import RecordingView
+
+DOWNSAMPLE_CASES = [
+    # Frames are written at full size by default
+    (1, (120, 120)),
+    # Downsampled frames shrink by the factor
+    (2, (60, 60)),
+    (7, (17, 17)),
+]
+
+
+@pytest.mark.parametrize("downsample,size", DOWNSAMPLE_CASES)
+def test_record_pngs(tmp_path, downsample, size):
+    """
+    Test that every drawn frame is written to its own PNG file of the
+    downsampled size.
+    """
+    board = GameBoard(6, seed=1)
+    with RecordingView(board, tmp_path / "frames", scale_factor=20,
+                       downsample=downsample) as recorder:
+        recorder.draw()
+        board.check_next_square()
+        recorder.draw()
+
+    files = sorted((tmp_path / "frames").iterdir())
+    assert [file.name for file in files] == ["frame_00000.png",
+                                             "frame_00001.png"]
+    assert pygame.image.load(str(files[1])).get_size() == size
+
+
+def test_record_gif(tmp_path):
+    """
+    Test that a GIF holds one frame per draw and shows the board colors.
+    """
+    image = pytest.importorskip("PIL.Image")
+    board = GameBoard(6, seed=1)
+    path = tmp_path / "game.gif"
+    with RecordingView(board, path, scale_factor=10) as recorder:
+        for _ in range(3):
+            recorder.draw()
+            board.check_next_square()
+
+    with image.open(path) as gif:
+        assert gif.n_frames == 3
+        assert gif.size == (60, 60)
+        colors = {color for _, color in gif.convert("RGB").getcolors()}
+    assert {(0, 0, 0), (255, 255, 255), (255, 0, 0)} <= colors
+
+
+def close_in_time(recorder):
+    """
+    Close a recorder on another thread and return the error it raised, or
+    fail the test if closing does not finish.
+    """
+    errors = []
+
+    def close():
+        try:
+            recorder.close()
+        except (OSError, pygame.error) as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=close, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "closing the recorder hung"
+    return errors
+
+
+def test_record_gif_unwritable(tmp_path):
+    """
+    Test that closing a GIF recorder whose file cannot be put in place
+    raises the error instead of hanging.
+    """
+    pytest.importorskip("PIL.Image")
+    path = tmp_path / "game.gif"
+    path.mkdir()
+    recorder = RecordingView(GameBoard(6, seed=1), path, scale_factor=10)
+    recorder.draw()
+
+    assert len(close_in_time(recorder)) == 1
+
+
+def test_record_pngs_unwritable(tmp_path):
+    """
+    Test that a PNG recorder whose directory disappears keeps accepting
+    frames and raises the error when it is closed.
+    """
+    path = tmp_path / "frames"
+    recorder = RecordingView(GameBoard(6, seed=1), path, scale_factor=10,
+                             max_queued=1)
+    path.rmdir()
+    for _ in range(3):
+        recorder.draw()
+
+    assert len(close_in_time(recorder)) == 1
@@ -0,0 +1,111 @@
+"""
+This module deals with testing some of the functions in the snake_storage
+module.
+"""
+import pandas as pd
+import pytest
+from snake_qtable import QTable
+from snake_storage import GameRecordWriter, CheckpointManager, write_atomic
+
+
+def test_record_numbers_games(tmp_path):
+    """
+    Test that games are numbered sequentially, buffered until flush_every
+    games are waiting, and numbered on from an existing record when it is
+    reopened.
+    """
+    path = tmp_path / "record.csv"
+    writer = GameRecordWriter(path, flush_every=3)
+    writer.record(4, 30, 0.01, 7)
+    writer.record(2)
+
+    assert len(pd.read_csv(path)) == 0
+    writer.record(9, 120)
+    assert len(pd.read_csv(path)) == 3
+
+    writer.record(5)
+    writer.close()
+    reopened = GameRecordWriter(path)
+    assert reopened.record(6) == 5
+    record = reopened.to_dataframe()
+    assert record["Game number"].tolist() == [1, 2, 3, 4, 5]
+    assert record["Length"].tolist() == [4, 2, 9, 5, 6]
+    assert record["Steps"].iloc[2] == 120
+    assert pd.isna(record["Steps"].iloc[1])
+
+
+def test_upgrade_old_record(tmp_path):
+    """
+    Test that a record from before the Steps, Time and Seed columns is
+    renumbered once and then appended to.
+    """
+    path = tmp_path / "record.csv"
+    path.write_text("Game number,Length\n1,3\n1,5\n", encoding="utf-8")
+    writer = GameRecordWriter(path)
+    writer.record(8, 40)
+    record = writer.to_dataframe()
+
+    assert list(record.columns) == GameRecordWriter.columns
+    assert record["Game number"].tolist() == [1, 2, 3]
+    assert record["Length"].tolist() == [3, 5, 8]
+
+
+def test_checkpoint_manager(tmp_path):
+    """
+    Test that checkpoints are written every few episodes from a snapshot of
+    the table, and that closing writes the latest table without leaving temp
+    files behind.
+    """
+    path = tmp_path / "agent.qtable"
+    table = QTable.new(2)
+    checkpoints = CheckpointManager(table, path, every_episodes=2)
+
+    assert not checkpoints.episode_done()
+    table.update(0, 0, 10.0)
+    assert checkpoints.episode_done()
+    table.update(0, 0, 10.0)
+    checkpoints.wait()
+    assert QTable.load(path).q_sums[0, 0] == 12
+
+    checkpoints.close()
+    assert QTable.load(path).q_sums[0, 0] == 22
+    assert [file.name for file in tmp_path.iterdir()] == ["agent.qtable"]
+
+
+def test_checkpoint_manager_reports_errors(tmp_path):
+    """
+    Test that a write into a directory that cannot be written to is raised
+    from wait and close instead of silently stopping the writer.
+    """
+    path = tmp_path / "missing" / "agent.csv"
+    checkpoints = CheckpointManager(QTable.new(2), path)
+
+    checkpoints.checkpoint()
+    with pytest.raises(OSError):
+        checkpoints.wait()
+    # The writer is still running, so the next snapshot fails the same way
+    with pytest.raises(OSError):
+        checkpoints.close()
+    assert not path.parent.exists()
+
+
+def test_write_atomic_keeps_old_agent(tmp_path):
+    """
+    Test that a failed write leaves the previous agent file untouched.
+    """
+    path = tmp_path / "agent.csv"
+    QTable.new(2).to_csv(path)
+    before = path.read_text()
+
+    class BrokenTable(QTable):
+        """
+        QTable that fails halfway through writing.
+        """
+        def write(self, path):
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("w_l,w_s")
+            raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        write_atomic(BrokenTable.new(5), path)
+    assert path.read_text() == before
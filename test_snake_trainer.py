@@ -0,0 +1,90 @@
+"""
+This module deals with testing some of the functions in the snake_trainer
+module.
+"""
+import numpy as np
+import pandas as pd
+from snake_qtable import QTable
+from snake_trainer import RLTrainer, collect_deltas, train_parallel
+
+
+def test_collect_deltas():
+    """
+    Test that a worker returns only what it learned: one visit per step of
+    its games, and no change to the agent it was given. Every game is
+    recorded with its own seed.
+    """
+    table = QTable.new(2)
+    q_sums = table.q_sums.copy()
+    q_delta, count_delta, records = collect_deltas(table.q_sums, table.counts,
+                                                   3, 8, seed=5)
+
+    assert np.array_equal(table.q_sums, q_sums)
+    assert len(records) == 3
+    assert count_delta.sum() == sum(record[1] for record in records)
+    assert [record[3] for record in records] == [5, 6, 7]
+    assert q_delta.shape == table.q_sums.shape
+
+
+def test_train_parallel(tmp_path):
+    """
+    Test that parallel training plays the requested number of games,
+    records each with a seed of its own and merges every visit of every
+    worker into the saved agent.
+    """
+    agent = tmp_path / "agent.csv"
+    record = tmp_path / "record.csv"
+    lengths = train_parallel(7, str(agent), str(record), workers=2,
+                             games_per_sync=2, side=8, max_steps=500)
+    table = QTable.from_csv(agent)
+
+    assert len(lengths) == 7
+    assert sorted(pd.read_csv(record)["Seed"]) == list(range(7))
+    assert table.counts.sum() > QTable.new(2).counts.sum()
+
+
+def test_train_parallel_without_record(tmp_path):
+    """
+    Test that parallel training works without a game record.
+    """
+    agent = tmp_path / "agent.csv"
+    lengths = train_parallel(3, str(agent), None, workers=2,
+                             games_per_sync=2, side=8, max_steps=200)
+
+    assert len(lengths) == 3
+    assert [file.name for file in tmp_path.iterdir()] == ["agent.csv"]
+
+
+def test_rl_trainer_reuses_agent(tmp_path):
+    """
+    Test that the trainer keeps the same agent and controller across games,
+    starts every game on a fresh board and records every game.
+    """
+    trainer = RLTrainer(str(tmp_path / "agent.csv"),
+                        str(tmp_path / "record.csv"), side=8)
+    table = trainer.table
+    controller = trainer.controller
+    played = trainer.train(5, max_steps=300)
+    trainer.close()
+
+    assert played == 5
+    assert trainer.table is table
+    assert trainer.controller is controller
+    assert trainer.board.snake_length == 1
+    assert not trainer.board.end_condition
+    assert len(pd.read_csv(tmp_path / "record.csv")) == 5
+    assert np.array_equal(QTable.from_csv(tmp_path / "agent.csv").counts,
+                          table.counts)
+
+
+def test_play_episode_on_step(tmp_path):
+    """
+    Test that the per-step hook is called once for every step of the game.
+    """
+    trainer = RLTrainer(str(tmp_path / "agent.csv"), None, side=8, seed=2)
+    calls = []
+    _, steps = trainer.play_episode(max_steps=50,
+                                    on_step=lambda: calls.append(1))
+    trainer.close()
+
+    assert len(calls) == steps > 0
@@ -0,0 +1,148 @@
+"""
+This module deals with testing some of the functions in the snake_vec
+module.
+"""
+import numpy as np
+import pytest
+from snake_model import GameBoard, BLANK, BORDER, SNAKE, APPLE, TURN_OFFSETS
+from snake_vec import VecGameBoard
+
+
+def test_initial_boards():
+    """
+    Test that every game starts with the same layout as GameBoard: a snake of
+    length one in the center moving down and a single apple.
+    """
+    boards = VecGameBoard(4, 10, seed=0)
+
+    assert boards.grid.shape == (4, 10, 10)
+    assert boards.grid.dtype == "int8"
+    assert (boards.heads == [5, 5]).all()
+    assert (boards.direction == [1, 0]).all()
+    assert (boards.snake_length == 1).all()
+    assert ((boards.grid == APPLE).sum(axis=(1, 2)) == 1).all()
+
+
+# general structure:
+# ([direction, num steps], [head, end condition])
+CHECK_NEXT_SQUARE_CASES = [
+    ([[-1, 0], 2], [[3, 5], False]),  # move up two steps
+    ([[0, -1], 3], [[5, 2], False]),  # move left three steps
+    ([[1, 0], 4], [[5, 5], True]),  # hit the bottom border and reset
+]
+
+
+@pytest.mark.parametrize("test_input,expected", CHECK_NEXT_SQUARE_CASES)
+def test_check_next_square(test_input, expected):
+    """
+    Test that check_next_square moves every snake like GameBoard and resets
+    games that end.
+
+    Test cases are commented next to the variable CHECK_NEXT_SQUARE_CASES
+    """
+    boards = VecGameBoard(3, 10, seed=1)
+    # clear randomly spawned apples so the snakes only move
+    boards.grid[boards.grid == APPLE] = BLANK
+    boards.change_direction(np.array([test_input[0]] * 3))
+
+    dones = np.zeros(3, dtype=bool)
+    for _ in range(test_input[1]):
+        _, dones = boards.check_next_square()
+
+    assert (boards.heads == expected[0]).all()
+    assert (dones == expected[1]).all()
+
+
+def test_random_play_invariants():
+    """
+    Test that after many random moves every board still holds exactly one
+    apple and as many Snake squares as the snake length.
+    """
+    boards = VecGameBoard(16, 8, seed=2)
+    rng = np.random.default_rng(3)
+    ended = 0
+    for _ in range(300):
+        boards.change_direction(boards.directions[rng.integers(4, size=16)])
+        _, dones = boards.check_next_square()
+        ended += dones.sum()
+
+        assert ((boards.grid == SNAKE).sum(axis=(1, 2))
+                == boards.snake_length).all()
+        assert ((boards.grid == APPLE).sum(axis=(1, 2)) == 1).all()
+    assert ended > 0
+
+
+def test_rl_state_matches_gameboard():
+    """
+    Test that the rl_state of every game, after many random turns, is the
+    rl_state GameBoard computes for the same head, apple, tail and direction.
+    """
+    boards = VecGameBoard(16, 8, seed=4)
+    board = GameBoard(8)
+    rng = np.random.default_rng(5)
+    for _ in range(200):
+        boards.turn(rng.integers(-1, 2, size=16))
+        boards.check_next_square()
+        walls, apple, tail = boards.rl_state
+
+        for game in range(16):
+            head = boards.heads[game]
+            board.change_direction(boards.direction[game].tolist())
+            assert apple[game].tolist() == board.vec2snakeframe(
+                (boards.apple[game] - head).tolist())
+            assert tail[game].tolist() == board.vec2snakeframe(
+                (boards.tails[game] - head).tolist())
+            expected_walls = [
+                boards.grid[game, head[0] + row, head[1] + col] in
+                (BORDER, SNAKE)
+                for row, col in TURN_OFFSETS[board.direction_code]]
+            assert walls[game].tolist() == expected_walls
+
+
+# general structure:
+# ([direction, turn], new direction)
+TURN_CASES = [
+    ([[1, 0], 1], [0, 1]),  # moving down, turn left
+    ([[1, 0], -1], [0, -1]),  # moving down, turn right
+    ([[0, -1], 0], [0, -1]),  # moving left, go straight
+    ([[0, -1], 1], [1, 0]),  # moving left, turn left
+]
+
+
+@pytest.mark.parametrize("test_input,expected", TURN_CASES)
+def test_turn(test_input, expected):
+    """
+    Test that turn changes every direction like GameBoard.turn.
+
+    Test cases are commented next to the variable TURN_CASES
+    """
+    boards = VecGameBoard(2, 10, seed=0)
+    boards.change_direction(np.array([test_input[0]] * 2))
+    boards.turn(np.array([test_input[1]] * 2))
+
+    assert (boards.direction == expected).all()
+
+
+def test_markov_state_matches_gameboard():
+    """
+    Test that the markov_state of every game, after many random turns, is
+    the markov_state GameBoard computes for the same squares.
+    """
+    boards = VecGameBoard(8, 8, seed=6)
+    rng = np.random.default_rng(7)
+    for _ in range(100):
+        boards.turn(rng.integers(-1, 2, size=8))
+        boards.check_next_square()
+        empty, to_apple, apple = boards.markov_state
+
+        for game in range(8):
+            head = boards.heads[game]
+            board = GameBoard(8)
+            board.grid[:] = boards.grid[game]
+            board.head[:] = head.tolist()
+            board.apple[:] = boards.apple[game].tolist()
+            expected = board.markov_state
+            assert empty[game].tolist() == expected[0]
+            assert to_apple[game].tolist() == expected[1]
+            assert apple[game].tolist() == [bool(value)
+                                            for value in expected[2]]
@@ -0,0 +1,238 @@
+"""
+This module deals with testing some of the functions in the snake_view
+module.
+"""
+import io
+import os
+import re
+import pygame
+import pytest
+from snake_model import GameBoard, CELL_OBJECTS, BLANK, BORDER, APPLE
+from snake_view import (PygameView, RenderScheduler, TextView, TileAtlas,
+                        clear_caches, get_atlas, get_font, render_text)
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+
+@pytest.fixture(name="screen")
+def fixture_screen():
+    """
+    Return a display surface opened on the dummy video driver, and shut
+    pygame down afterwards.
+    """
+    pygame.init()
+    yield pygame.display.set_mode((60, 60))
+    clear_caches()
+    pygame.quit()
+
+
+def test_text_caches(screen):
+    """
+    Test that fonts and rendered text are reused, and that quitting through
+    the view drops them so no stale font outlives pygame.quit.
+    """
+    view = PygameView(GameBoard(6), 10, screen=screen)
+    surface = render_text("GAME OVER", 30, (255, 0, 0))
+
+    assert get_font(30) is get_font(30)
+    assert render_text("GAME OVER", 30, (255, 0, 0)) is surface
+
+    view.quit()
+    assert get_font.cache_info().currsize == 0
+    assert render_text.cache_info().currsize == 0
+    assert get_atlas.cache_info().currsize == 0
+    pygame.init()
+    assert render_text("GAME OVER", 30, (255, 0, 0)) is not surface
+
+
+def test_tile_atlas(screen):
+    """
+    Test that the atlas is rendered once per scale factor, holds a sprite of
+    the right color for each cell code and snake shade, and that the view
+    blits the board from it.
+    """
+    atlas = get_atlas(10)
+    assert get_atlas(10) is atlas
+    assert len(atlas.shade_areas) == TileAtlas.shades
+    for cell in CELL_OBJECTS:
+        area = atlas.cell_areas[cell.code]
+        assert atlas.tiles.get_at(area.center)[:3] == cell.color
+    assert atlas.tiles.get_at(atlas.shade_areas[-1].center)[:3] == \
+        CELL_OBJECTS[2].color
+
+    board = GameBoard(6, seed=1)
+    view = PygameView(board, 10, screen=screen)
+    assert view.atlas is get_atlas(10, view.eye_color, view.eye_size,
+                                   view.padding)
+    view.draw()
+    apple_row, apple_col = board.apple
+    assert screen.get_at((5, 5))[:3] == CELL_OBJECTS[BORDER].color
+    assert screen.get_at((apple_col * 10 + 5, apple_row * 10 + 5))[:3] == \
+        CELL_OBJECTS[APPLE].color
+
+
+def test_pygame_view_redraws_changes(screen):
+    """
+    Test that after the first frame only the changed squares and the snake
+    are blitted again.
+    """
+    board = GameBoard(6, seed=1)
+    view = PygameView(board, 10, screen=screen)
+    assert view._render() is None
+    board.check_next_square()
+
+    assert view._render() == {(3, 3), (4, 3)}
+    assert screen.get_at((35, 35))[:3] == CELL_OBJECTS[BLANK].color
+
+
+class CountingView:
+    """
+    Stand-in view that counts the calls the scheduler makes.
+    """
+    def __init__(self):
+        self.draws = 0
+        self.invalidations = 0
+
+    def draw(self):
+        """
+        Count a drawn frame.
+        """
+        self.draws += 1
+
+    def invalidate(self):
+        """
+        Count a request for a full redraw.
+        """
+        self.invalidations += 1
+
+
+class FakeClock:
+    """
+    Clock that advances a fixed number of milliseconds per step instead of
+    reading the real time, and records the frame rates it was ticked with.
+    """
+    def __init__(self, step_ms):
+        self.now = 0
+        self.step_ms = step_ms
+        self.ticks = []
+
+    def tick(self, framerate=0):
+        """
+        Record the frame rate the scheduler asked for.
+        """
+        self.ticks.append(framerate)
+
+    def get_fps(self):
+        """
+        Return no measured frame rate.
+        """
+        return 0.0
+
+    def get_ticks(self):
+        """
+        Return the fake time in milliseconds.
+        """
+        return self.now
+
+
+# general structure:
+# ([render_every, episode_every, episodes, steps per episode],
+#  [frames drawn, full redraws requested])
+RENDER_CASES = [
+    ([1, 1, 2, 5], [10, 0]),  # every step of every episode is drawn
+    ([3, 1, 2, 7], [4, 0]),  # steps 3 and 6 of each episode are drawn
+    ([1, 2, 3, 4], [8, 1]),  # episodes 0 and 2 are drawn, 2 after a skip
+    ([2, 3, 4, 4], [4, 1]),  # every other step of episodes 0 and 3
+]
+
+
+@pytest.mark.parametrize("test_input,expected", RENDER_CASES)
+def test_render_scheduler_skips(test_input, expected):
+    """
+    Test that the scheduler draws every k-th step of one episode in N, and
+    asks for a full redraw when drawing resumes after skipped episodes.
+
+    Test cases are commented next to the variable RENDER_CASES
+    """
+    render_every, episode_every, episodes, steps = test_input
+    view = CountingView()
+    clock = FakeClock(0)
+    scheduler = RenderScheduler(view, render_every, episode_every,
+                                clock=clock, get_ticks=clock.get_ticks)
+    drawn = 0
+    for _ in range(episodes):
+        scheduler.start_episode()
+        drawn += sum(scheduler.step() for _ in range(steps))
+
+    assert [view.draws, view.invalidations] == expected
+    assert drawn == view.draws
+    assert clock.ticks == [0] * view.draws
+
+
+# general structure:
+# ([max_fps, throttle], [frames drawn, frame rate passed to tick])
+FPS_CASES = [
+    ([None, False], [10, 0]),  # no cap draws every step
+    ([10, False], [3, 0]),  # 30 ms steps only draw every 120 ms or more
+    ([10, True], [10, 10]),  # throttling draws every step and waits
+]
+
+
+@pytest.mark.parametrize("test_input,expected", FPS_CASES)
+def test_render_scheduler_fps(test_input, expected):
+    """
+    Test that a frame rate cap drops frames that come too soon, or draws
+    every frame and lets the clock wait when throttling.
+
+    Test cases are commented next to the variable FPS_CASES
+    """
+    max_fps, throttle = test_input
+    view = CountingView()
+    clock = FakeClock(30)
+    scheduler = RenderScheduler(view, max_fps=max_fps, throttle=throttle,
+                                clock=clock, get_ticks=clock.get_ticks)
+    scheduler.start_episode()
+    for _ in range(10):
+        clock.now += clock.step_ms
+        scheduler.step()
+
+    assert view.draws == expected[0]
+    assert clock.ticks == [expected[1]] * view.draws
+
+
+def test_text_view_ansi_diff():
+    """
+    Test that the first terminal frame prints the whole board and that the
+    next frame only moves the cursor to the squares that changed.
+    """
+    board = GameBoard(6, seed=1)
+    stream = io.StringIO()
+    view = TextView(board, stream, ansi=True)
+    view.draw()
+    assert stream.getvalue().startswith(f"\x1b[2J\x1b[H{board!r}")
+
+    stream.seek(0)
+    stream.truncate()
+    board.check_next_square()
+    view.draw()
+    frame = stream.getvalue()
+
+    # Squares are (row, col) on the board and 1-based (row, col) on screen
+    assert set(re.findall(r"\x1b\[(\d+);(\d+)H(.)", frame)) == \
+        {("4", "4", " "), ("5", "4", "■"), ("7", "1", "L")}
+    assert "\x1b[2J" not in frame
+
+
+def test_text_view_plain():
+    """
+    Test that a stream that is not a terminal gets the whole board every
+    frame, without ANSI sequences.
+    """
+    board = GameBoard(6, seed=1)
+    stream = io.StringIO()
+    view = TextView(board, stream)
+    view.draw()
+    board.check_next_square()
+    view.draw()
+
+    assert stream.getvalue() == f"{GameBoard(6, seed=1)!r}\n{board!r}\n"